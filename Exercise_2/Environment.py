@@ -9,7 +9,7 @@ import numpy as np
 import numpy.random as rn
 
 
-class Environment:
+class Environment(object):
   """
   Environment for the robot to run around. Holds a list of objects
   the robot should either avoid or catch.
@@ -32,11 +32,21 @@ class Environment:
     self.xmax = _xmax
     self.ymax = _ymax
 
-    self.Obs = [{'x': rn.rand()*_xmax,
-                 'y': rn.rand()*_ymax,
-                 'r': _MinSize + rn.rand()*(_MaxSize - _MinSize)
-                 } for _ in xrange(_Obs)
-                ]
+    # Objects are held as arrays of their x, y and size, drawn object by
+    # object in that order
+    Draws = rn.rand(_Obs, 3)
+
+    self.ObX = Draws[:, 0] * _xmax
+    self.ObY = Draws[:, 1] * _ymax
+    self.ObR = _MinSize + Draws[:, 2] * (_MaxSize - _MinSize)
+
+  @property
+  def Obs(self):
+    """
+    List of the objects, as dicts of their x, y and size r
+    """
+
+    return [{'x': x, 'y': y, 'r': r} for x, y, r in zip(self.ObX, self.ObY, self.ObR)]
 
   def GetSensors(self, x, y, w):
     """
@@ -44,56 +54,59 @@ class Environment:
     its position (x,y) and orientation w.
     All geometry is calculated on a torus with limits xmax and ymax.
 
+    The sensor model is computed for all objects at once, and for many
+    robots at once when x, y and w are arrays.
+
     Inputs:
-    x, y, w -- Position and orientation of robot
+    x, y, w -- Position and orientation of robot, or arrays of them for
+               many robots
 
     Outputs:
-    SL, SR -- Activities of left and right sensor
+    SL, SR -- Activities of left and right sensor, or arrays of them
     """
 
-    SL = 0
-    SR = 0
     Range = 25.0  # Sensor range
 
-    for Ob in self.Obs:
-      x2 = Ob['x']
-      y2 = Ob['y']
+    # Robots along the first axis, objects along the second
+    x = np.asarray(x, dtype=float)[..., np.newaxis]
+    y = np.asarray(y, dtype=float)[..., np.newaxis]
+    w = np.asarray(w, dtype=float)[..., np.newaxis]
 
-      # Find the shortest x distance on torus
-      if abs(x2 + self.xmax - x) < abs(x2 - x):
-        x2 = x2 + self.xmax
-      elif abs(x2 - self.xmax - x) < abs(x2 - x):
-        x2 = x2 - self.xmax
+    # Find the shortest x and y distances on torus
+    x2 = self._Nearest(self.ObX, x, self.xmax)
+    y2 = self._Nearest(self.ObY, y, self.ymax)
 
-      # Find shortest y distance on torus
-      if abs(y2 + self.ymax - y) < abs(y2 - y):
-        y2 = y2 + self.ymax
-      elif abs(y2 - self.ymax - y) < abs(y2 - y):
-        y2 = y2 - self.ymax
+    dx = x2 - x
+    dy = y2 - y
 
-      dx = x2 - x
-      dy = y2 - y
+    z = np.sqrt(dx**2 + dy**2)
 
-      z = np.sqrt(dx**2 + dy**2)
+    v = np.arctan2(dy, dx)
+    v = np.where(v < 0, 2*np.pi + v, v)
 
-      if z < Range:
-        v = np.arctan2(dy, dx)
-        if v < 0:
-          v = 2*np.pi + v
+    dw = v - w  # angle difference between robot's heading and object
 
-        dw = v - w  # angle difference between robot's heading and object
+    # Stimulus strength depends on distnace to object boundary
+    S = np.where(z < Range, (Range - z)/Range, 0)
 
-        # Stimulus strength depends on distnace to object boundary
-        S = (Range - z)/Range
+    Left = (((dw >= np.pi/8) & (dw < np.pi/2)) |
+            ((dw < -1.5*np.pi) & (dw >= -2*np.pi+np.pi/8)))
+    Right = ~Left & (((dw > 1.5*np.pi) & (dw <= 2*np.pi - np.pi/8)) |
+                     ((dw <= -np.pi/8) & (dw > -np.pi/2)))
 
-        if ((dw >= np.pi/8 and dw < np.pi/2) or
-                (dw < -1.5*np.pi and dw >= -2*np.pi+np.pi/8)):
-          SL = max(S, SL)
-          # SL += S
-        elif ((dw > 1.5*np.pi and dw <= 2*np.pi - np.pi/8) or
-                (dw <= -np.pi/8 and dw > -np.pi/2)):
-          SR = max(S, SR)
-          # SR += S
+    SL = np.max(np.where(Left, S, 0), axis=-1, initial=0)
+    SR = np.max(np.where(Right, S, 0), axis=-1, initial=0)
 
     return SL, SR
 
+  @staticmethod
+  def _Nearest(x2, x, xmax):
+    """
+    Moves the coordinates x2 by xmax either way when that brings them
+    closer to x across the torus
+    """
+
+    Up = np.abs(x2 + xmax - x) < np.abs(x2 - x)
+    Down = ~Up & (np.abs(x2 - xmax - x) < np.abs(x2 - x))
+
+    return np.where(Up, x2 + xmax, np.where(Down, x2 - xmax, x2))
@@ -1,3 +1,4 @@
+from bisect import bisect_right
 import numpy as np
 
 
@@ -61,8 +62,9 @@ class IzNetwork:
                 S = self.layer[i].S[j]
 
                 # Firings contains time and neuron idx of each spike.
-                # [t, index of the neuron in the layer j]
-                firings = self.layer[j].firings
+                # [t, index of the neuron in the layer j]. Only those
+                # within the maximum delay can still be delivered
+                firings = self.layer[j].RecentFirings(t - self.Dmax)
 
                 # Find incoming spikes taking delays into account
                 delay = self.layer[i].delay[j]
@@ -77,6 +79,7 @@ class IzNetwork:
                     k = k - 1
 
         # Update v and u using the Izhikevich model and Euler method
+        spikes = []
         for k in xrange(int(1 / dt)):
             v = self.layer[i].v
             u = self.layer[i].u
@@ -90,24 +93,27 @@ class IzNetwork:
             fired = np.where(self.layer[i].v >= 30)[0]
 
             if len(fired) > 0:
-                for f in fired:
-                    # Add spikes into spike train
-                    if len(self.layer[i].firings) != 0:
-                        self.layer[i].firings = np.vstack(
-                            [self.layer[i].firings, [t, f]])
-                    else:
-                        self.layer[i].firings = np.array([[t, f]])
-
-                    # Reset the membrane potential after spikes
-                    self.layer[i].v[f] = self.layer[i].c[f]
-                    self.layer[i].u[f] += self.layer[i].d[f]
+                # Collect all spikes of this sub-step as [t, index] rows
+                spikes.append(np.column_stack([t * np.ones(len(fired), dtype=int), fired]))
+
+                # Reset the membrane potential after spikes
+                self.layer[i].v[fired] = self.layer[i].c[fired]
+                self.layer[i].u[fired] += self.layer[i].d[fired]
+
+        # Add spikes into spike train, once for the whole millisecond
+        if len(spikes) > 0:
+            self.layer[i].AddFirings(np.vstack(spikes))
 
         return
 
 
-class IzLayer:
+class IzLayer(object):
     """
     Layer of Izhikevich neurons to be used inside an IzNetwork.
+
+    Firings are kept as a list of arrays, one per millisecond with spikes,
+    and only stacked into a single array when firings is read. Recording
+    a millisecond of spikes therefore costs the same however long the run.
     """
 
     def __init__(self, n):
@@ -127,3 +133,59 @@ class IzLayer:
         self.S = {}
         self.delay = {}
         self.factor = {}
+
+        self.firings = np.array([])
+
+    @property
+    def firings(self):
+        """
+        Array of [t, index] rows of every spike in the layer, in time order,
+        or an empty array if there have been none
+        """
+
+        if len(self._chunks) == 0:
+            return self._empty
+
+        # Stack once, and keep the result so the next read does not repeat it
+        if len(self._chunks) > 1:
+            self._chunks = [np.vstack(self._chunks)]
+            self._starts = self._starts[:1]
+
+        return self._chunks[0]
+
+    @firings.setter
+    def firings(self, firings):
+        firings = np.asarray(firings)
+
+        self._empty = firings if firings.size == 0 else np.array([])
+        self._chunks = [] if firings.size == 0 else [firings]
+
+        # Time of the first spike of every chunk
+        self._starts = [] if firings.size == 0 else [firings[0, 0]]
+
+    def AddFirings(self, spikes):
+        """
+        Appends an array of [t, index] rows of spikes, all later than any
+        recorded so far
+        """
+
+        self._chunks.append(spikes)
+        self._starts.append(spikes[0, 0])
+
+    def RecentFirings(self, since):
+        """
+        Returns the [t, index] rows of the spikes after time since, in time
+        order, without stacking the whole spike train
+        """
+
+        # Chunks starting after since are recent as a whole, and the chunk
+        # before them may end with recent spikes
+        first = max(bisect_right(self._starts, since) - 1, 0)
+        recent = self._chunks[first:]
+
+        if len(recent) == 0:
+            return self._empty
+
+        recent[0] = recent[0][np.searchsorted(recent[0][:, 0], since, side='right'):]
+
+        return recent[0] if len(recent) == 1 else np.vstack(recent)
@@ -0,0 +1,273 @@
+"""
+Computational Neurodynamics
+Exercise 3
+
+(C) Murray Shanahan et al, 2015
+"""
+
+import numpy as np
+import numpy.random as rn
+from scipy.sparse import csr_matrix, diags
+from scipy.stats import norm
+
+# Number of set bits in every possible byte
+POPCOUNT = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.int64)
+
+
+def GraphMetrics(CIJ, samples=None, confidence=0.95):
+    """
+    Computes the clustering coefficients, characteristic path length, and
+    global and local efficiencies of the graph with connection matrix CIJ,
+    in one pass. Self-connections are ignored.
+
+    Distances come from breadth-first searches run 64 sources at a time,
+    with the sources that have reached each node held as the bits of one
+    integer. Memory stays linear in the number of edges. The neighbourhood
+    of every node is found once, from the triangles through it, and serves
+    both the clustering coefficients and the local efficiencies.
+
+    The path length and global efficiency are means over source nodes of
+    the mean distance, and mean inverse distance, to the other nodes. With
+    samples given, they are estimated from that many sources drawn at
+    random without replacement, which takes samples / N of the time of the
+    exact computation, and the confidence intervals of the estimates are
+    those of a normal distribution, corrected for the finite number of
+    nodes. Otherwise every node is a source and the intervals are exact.
+
+    Inputs:
+    CIJ        -- Graph connectivity matrix, dense or scipy.sparse. Must be
+                  binary (0 or 1) and undirected.
+    samples    -- Number of sources to estimate distances from, or None for
+                  every node
+    confidence -- Confidence level of the intervals
+
+    Returns a dict of:
+    degree               -- Degree of every node
+    clustering           -- Clustering coefficient of every node, as bct's
+                            clustering_coef_bu
+    path_length          -- Characteristic path length, the mean distance
+                            between distinct nodes, as bct's charpath.
+                            Infinite if a source does not reach every node.
+    path_length_ci       -- (low, high) confidence interval of path_length
+    global_efficiency    -- Mean inverse distance between distinct nodes
+    global_efficiency_ci -- (low, high) confidence interval of
+                            global_efficiency
+    local_efficiency     -- Global efficiency of the neighbourhood of every
+                            node, as bct's efficiency_bin(CIJ, local=True)
+    """
+
+    A = Adjacency(CIJ)
+    N = A.shape[0]
+    degree = np.diff(A.indptr)
+
+    if samples is None or samples >= N:
+        sources = np.arange(N)
+    else:
+        sources = rn.choice(N, samples, replace=False)
+
+    distance_sum, inverse_sum, reached = SourceDistances(A, sources)
+
+    others = max(N - 1, 1)
+    connected = reached == N - 1
+    path_lengths = np.where(connected, distance_sum, np.inf) / others
+
+    # Neighbourhoods are joined into one graph, whose node e is entry e of
+    # A, i.e. neighbour A.indices[e] of node owner[e]
+    owner = np.repeat(np.arange(N), degree)
+    neighbourhoods = Neighbourhoods(A, owner)
+
+    possible = degree * (degree - 1)
+    triangles = np.bincount(owner[neighbourhoods.nonzero()[0]], minlength=N)
+
+    return {
+        'degree': degree,
+        'clustering': np.where(possible > 0, triangles / np.maximum(possible, 1.0), 0),
+        'path_length': np.mean(path_lengths),
+        'path_length_ci': SampleInterval(path_lengths, N, confidence),
+        'global_efficiency': np.mean(inverse_sum / others),
+        'global_efficiency_ci': SampleInterval(inverse_sum / others, N, confidence),
+        'local_efficiency': LocalEfficiency(A, owner, neighbourhoods),
+    }
+
+
+def SourceDistances(A, sources):
+    """
+    Runs a breadth-first search over the binary adjacency matrix A from each
+    of the given source nodes, 64 at a time. Returns, for every source, the
+    sum of the distances and the sum of the inverse distances to the nodes
+    it reaches, and the number of nodes it reaches.
+    """
+
+    N = A.shape[0]
+
+    distance_sum = np.zeros(len(sources))
+    inverse_sum = np.zeros(len(sources))
+    reached = np.zeros(len(sources), dtype=np.int64)
+
+    for first in range(0, len(sources), 64):
+        batch = sources[first:first + 64]
+
+        bits = np.zeros(N, dtype=np.uint64)
+        bits[batch] = SourceBits(len(batch))
+
+        for distance, new in enumerate(BreadthFirstLevels(A, bits), 1):
+            count = SourceCounts(new, len(batch))
+
+            distance_sum[first:first + 64] += distance * count
+            inverse_sum[first:first + 64] += count / float(distance)
+            reached[first:first + 64] += count
+
+    return distance_sum, inverse_sum, reached
+
+
+def SampleInterval(values, population, confidence=0.95):
+    """
+    Confidence interval of the mean of a population of the given size, from
+    the values of a sample of it drawn without replacement. Exact when the
+    sample is the whole population.
+    """
+
+    mean = np.mean(values)
+
+    if len(values) == population or not np.isfinite(mean):
+        return (mean, mean)
+
+    if len(values) < 2:
+        return (-np.inf, np.inf)
+
+    finite_population = np.sqrt(1.0 - float(len(values)) / population)
+    error = np.std(values, ddof=1) / np.sqrt(len(values)) * finite_population
+    z = norm.ppf(0.5 + confidence / 2.0)
+
+    return (mean - z * error, mean + z * error)
+
+
+def Adjacency(CIJ):
+    """
+    Converts a connectivity matrix into a binary scipy.sparse.csr_matrix
+    with sorted indices and no self-connections.
+    """
+
+    A = csr_matrix(CIJ, dtype=float)
+    A = csr_matrix(A - diags(A.diagonal()))
+    A.eliminate_zeros()
+    A.sort_indices()
+    A.data[:] = 1
+
+    return A
+
+
+def SourceBits(no_of_sources):
+    """
+    Bitsets with one bit set for each of up to 64 sources
+    """
+
+    return np.left_shift(np.uint64(1), np.arange(no_of_sources, dtype=np.uint64))
+
+
+def Popcount(bits):
+    """
+    Number of set bits in every entry of an array of uint64 bitsets
+    """
+
+    return POPCOUNT[bits.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+def SourceCounts(bits, no_of_sources):
+    """
+    Number of entries of an array of uint64 bitsets with each of the first
+    no_of_sources bits set
+    """
+
+    bits = bits[bits != 0]
+
+    # unpackbits takes the bits of each byte from the most significant, and
+    # the bytes of each bitset come from the least significant
+    unpacked = np.unpackbits(bits.view(np.uint8).reshape(-1, 8), axis=1)
+    counts = unpacked.reshape(-1, 8, 8)[:, :, ::-1].reshape(-1, 64).sum(axis=0, dtype=np.int64)
+
+    return counts[:no_of_sources]
+
+
+def BreadthFirstLevels(A, sources):
+    """
+    Runs up to 64 breadth-first searches over the binary adjacency matrix A
+    at once. Bit k of sources[v] is set when node v is a source of search k.
+
+    Yields, for distances 1, 2, ..., the bitsets of the searches that first
+    reach each node at that distance.
+    """
+
+    rows = np.where(np.diff(A.indptr) > 0)[0]
+    reached = sources.copy()
+    frontier = sources.copy()
+
+    while True:
+        spread = np.zeros_like(frontier)
+        if len(rows) > 0:
+            spread[rows] = np.bitwise_or.reduceat(frontier[A.indices], A.indptr[rows])
+
+        frontier = spread & ~reached
+        reached |= frontier
+
+        if not frontier.any():
+            return
+
+        yield frontier
+
+
+def Neighbourhoods(A, owner):
+    """
+    Joins the neighbourhood of every node of A into one graph. Node e of the
+    joined graph is entry e of A, the neighbour A.indices[e] of node
+    owner[e], and it connects to the other neighbours of owner[e] that
+    A.indices[e] connects to. Each edge of the joined graph is half of a
+    triangle through its owner.
+    """
+
+    N = A.shape[0]
+    degree = np.diff(A.indptr)
+    member = A.indices
+
+    # Every neighbour w of every member u of each neighbourhood
+    lengths = degree[member]
+    entry = np.repeat(np.arange(A.nnz), lengths)
+    offsets = np.arange(np.sum(lengths)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    w = member[np.repeat(A.indptr[member], lengths) + offsets]
+
+    # Of which those that are also neighbours of the owner are in the neighbourhood
+    keys = owner.astype(np.int64) * N + member
+    candidates = owner[entry].astype(np.int64) * N + w
+    position = np.minimum(np.searchsorted(keys, candidates), A.nnz - 1)
+    inside = keys[position] == candidates
+
+    return csr_matrix((np.ones(np.sum(inside)), (entry[inside], position[inside])), shape=(A.nnz, A.nnz))
+
+
+def LocalEfficiency(A, owner, neighbourhoods):
+    """
+    Computes the global efficiency of the neighbourhood of every node of A,
+    by breadth-first searches over the joined neighbourhoods. Every member
+    of a neighbourhood is a source, one bit per member, so all of the
+    neighbourhoods are searched together.
+    """
+
+    N = A.shape[0]
+    degree = np.diff(A.indptr)
+    local_index = np.arange(A.nnz) - np.repeat(A.indptr[:-1], degree)
+
+    inverse_sum = np.zeros(N)
+
+    # Neighbourhoods of more than 64 nodes take one more round per 64 nodes
+    for first in range(0, np.max(degree) if N > 0 else 0, 64):
+        in_round = (local_index >= first) & (local_index < first + 64)
+
+        sources = np.zeros(A.nnz, dtype=np.uint64)
+        sources[in_round] = SourceBits(64)[local_index[in_round] - first]
+
+        for distance, new in enumerate(BreadthFirstLevels(neighbourhoods, sources), 1):
+            inverse_sum += np.bincount(owner, weights=Popcount(new), minlength=N) / float(distance)
+
+    possible = degree * (degree - 1)
+
+    return np.where(possible > 0, inverse_sum / np.maximum(possible, 1.0), 0)
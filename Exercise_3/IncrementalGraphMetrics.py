@@ -0,0 +1,133 @@
+"""
+Computational Neurodynamics
+Exercise 3
+
+(C) Murray Shanahan et al, 2015
+"""
+
+import numpy as np
+from GraphMetrics import Adjacency
+from NetworkRingLattice import EdgesToConnectivity
+
+
+class IncrementalGraphMetrics(object):
+    """
+    Degrees and clustering coefficients of a binary undirected graph, kept
+    up to date as its edges are added, removed or rewired one at a time.
+
+    The neighbours of every node are held as a set, together with the number
+    of triangles through every node. Adding or removing the edge (i, j) only
+    changes the triangles through i, j and their common neighbours, so it
+    costs one intersection of two neighbour sets instead of a recompute.
+    Path lengths and efficiencies are not incremental; use GraphMetrics on
+    connectivity() for those.
+
+    Tracing a Watts-Strogatz rewiring trajectory edge by edge:
+
+      CIJ, (i, j, h) = NetworkWattsStrogatz(N, k, p, moves=True)
+      metrics = IncrementalGraphMetrics(NetworkRingLattice(N, k))
+      for m in range(len(i)):
+        metrics.rewire(i[m], j[m], h[m])
+        trajectory.append(metrics.mean_clustering)
+    """
+
+    def __init__(self, CIJ):
+        """
+        Inputs:
+        CIJ -- Graph connectivity matrix, dense or scipy.sparse. Must be
+               binary (0 or 1) and undirected. Self-connections are ignored.
+        """
+
+        A = Adjacency(CIJ)
+
+        if (A != A.T).nnz > 0:
+            raise ValueError("Expected an undirected graph, with a symmetric connectivity matrix")
+
+        self.N = A.shape[0]
+        self.neighbours = [set(A.indices[A.indptr[i]:A.indptr[i + 1]]) for i in range(self.N)]
+        self.degree = np.diff(A.indptr)
+
+        # Each triangle through node i is counted twice on row i
+        self.triangles = np.asarray(A.dot(A).multiply(A).sum(axis=1)).ravel() // 2
+        self.triangles = self.triangles.astype(np.int64)
+
+    @property
+    def clustering(self):
+        """
+        Clustering coefficient of every node, as bct's clustering_coef_bu
+        """
+
+        possible = self.degree * (self.degree - 1) / 2.0
+        return np.where(possible > 0, self.triangles / np.maximum(possible, 1.0), 0)
+
+    @property
+    def mean_clustering(self):
+        return np.mean(self.clustering)
+
+    @property
+    def mean_degree(self):
+        return np.mean(self.degree)
+
+    def add_edge(self, i, j):
+        """
+        Connects nodes i and j, which must not already be connected
+        """
+
+        if i == j or j in self.neighbours[i]:
+            raise ValueError("Cannot add edge (" + str(i) + ", " + str(j) + "), it is a self-connection or exists")
+
+        self._count_triangles(i, j, 1)
+
+        self.neighbours[i].add(j)
+        self.neighbours[j].add(i)
+        self.degree[[i, j]] += 1
+
+    def remove_edge(self, i, j):
+        """
+        Disconnects nodes i and j, which must be connected
+        """
+
+        if j not in self.neighbours[i]:
+            raise ValueError("Cannot remove edge (" + str(i) + ", " + str(j) + "), it does not exist")
+
+        self.neighbours[i].discard(j)
+        self.neighbours[j].discard(i)
+        self.degree[[i, j]] -= 1
+
+        self._count_triangles(i, j, -1)
+
+    def rewire(self, i, j, h):
+        """
+        Moves the edge (i, j) to (i, h), as one step of the Watts-Strogatz
+        procedure, see NetworkWattsStrogatz's moves
+        """
+
+        if h == i or h in self.neighbours[i]:
+            raise ValueError("Cannot rewire edge (" + str(i) + ", " + str(j) + ") to (" + str(i) + ", " +
+                             str(h) + "), it is a self-connection or exists")
+
+        self.remove_edge(i, j)
+        self.add_edge(i, h)
+
+    def connectivity(self, output='dense'):
+        """
+        Builds the connectivity of the graph as it stands, see
+        EdgesToConnectivity for output
+        """
+
+        i = np.repeat(np.arange(self.N), self.degree)
+        j = np.array([n for node in range(self.N) for n in sorted(self.neighbours[node])], dtype=int)
+        once = i < j
+
+        return EdgesToConnectivity(self.N, i[once], j[once], output)
+
+    def _count_triangles(self, i, j, change):
+        """
+        Adds change to the triangles closed by the edge (i, j), while it is
+        not in the neighbour sets
+        """
+
+        common = list(self.neighbours[i] & self.neighbours[j])
+
+        self.triangles[[i, j]] += change * len(common)
+        self.triangles[common] += change
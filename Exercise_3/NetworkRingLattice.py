@@ -8,7 +8,7 @@ Exercise 3
 import numpy as np
 
 
-def NetworkRingLattice(N, k):
+def NetworkRingLattice(N, k, output='dense'):
   """
   Creates a ring lattice with N nodes and neighbourhood size k.
   Choosing k = 2 connects each node to its nearest 2 nodes, k = 4
@@ -19,21 +19,63 @@ def NetworkRingLattice(N, k):
   fully connected net.
 
   Inputs:
-  N -- Number of nodes
-  k -- Neighbourhood size of the initial ring lattice
+  N      -- Number of nodes
+  k      -- Neighbourhood size of the initial ring lattice
+  output -- 'dense', 'sparse' or 'edges', see EdgesToConnectivity
   """
 
-  # Create empty connectivity matrix
-  CIJ = np.zeros([N, N])
+  i, j = RingLatticeEdges(N, k)
 
-  # Loop through the nodes and connect the neighbourhoods
-  for i in range(N):
-    # Note that since the network is undirected (symmetric) we only
-    # need to look at the upper triangular bit of CIJ.
-    for j in range(i+1, N):
-      if i != j and min(abs(i-j), N - abs(i-j)) <= k/2.0:
-        CIJ[i, j] = 1
-        CIJ[j, i] = 1
+  return EdgesToConnectivity(N, i, j, output)
 
-  return(CIJ)
 
+def RingLatticeEdges(N, k):
+  """
+  Lists the edges of a ring lattice with N nodes and neighbourhood
+  size k, without building its connectivity matrix. Each undirected
+  edge appears once, as a pair (i[e], j[e]) with i[e] < j[e].
+  """
+
+  # Node i connects to the nodes up to k/2 steps clockwise of it,
+  # which covers the anticlockwise neighbours from their side
+  offsets = np.arange(1, min(k // 2, N // 2) + 1)
+
+  i = np.repeat(np.arange(N), len(offsets))
+  j = (i + np.tile(offsets, N)) % N
+
+  # Opposite nodes are half a ring apart both ways round, so their
+  # edge is listed twice when N is even
+  edges = np.unique(np.minimum(i, j) * N + np.maximum(i, j))
+
+  return edges // N, edges % N
+
+
+def EdgesToConnectivity(N, i, j, output='dense'):
+  """
+  Builds the connectivity of an undirected graph with N nodes from
+  its list of edges, each given once.
+
+  Inputs:
+  N      -- Number of nodes
+  i, j   -- Arrays of the nodes at either end of every edge
+  output -- 'dense' for a symmetric [N, N] array, 'sparse' for a
+            symmetric scipy.sparse.csr_matrix, or 'edges' for the
+            (i, j) arrays themselves
+  """
+
+  if output == 'edges':
+    return i, j
+
+  if output == 'sparse':
+    from scipy.sparse import coo_matrix
+
+    ones = np.ones(2 * len(i))
+    return coo_matrix((ones, (np.append(i, j), np.append(j, i))), shape=(N, N)).tocsr()
+
+  if output == 'dense':
+    CIJ = np.zeros([N, N])
+    CIJ[i, j] = 1
+    CIJ[j, i] = 1
+    return CIJ
+
+  raise ValueError("Unknown output " + str(output) + ", expected 'dense', 'sparse' or 'edges'")
@@ -7,34 +7,134 @@ Exercise 3
 
 import numpy as np
 import numpy.random as rn
-from NetworkRingLattice import NetworkRingLattice
+from NetworkRingLattice import EdgesToConnectivity, RingLatticeEdges
 
 
-def NetworkWattsStrogatz(N, k, p):
+def NetworkWattsStrogatz(N, k, p, output='dense', moves=False):
     """
     Creates a ring lattice with N nodes and neighbourhood size k, then
     rewires it according to the Watts-Strogatz procedure with probability p.
 
+    Every edge (i, j) of the lattice, with i < j, is rewired with
+    probability p to (i, h), where h is drawn uniformly from the other
+    nodes. The draws are made for all edges at once, and redrawn where
+    they would duplicate an edge, so the rewired network has no self
+    connections and as many edges as the lattice. Edges still duplicated
+    after 100 rounds of redraws, which only happens when nodes have few
+    free partners left, are drawn one at a time from the nodes i is not
+    yet connected to. A ValueError is raised if i has none.
+
     Inputs:
-    N -- Number of nodes
-    k -- Neighbourhood size of the initial ring lattice
-    p -- Rewiring probability
+    N      -- Number of nodes
+    k      -- Neighbourhood size of the initial ring lattice
+    p      -- Rewiring probability
+    output -- 'dense', 'sparse' or 'edges', see EdgesToConnectivity
+    moves  -- Whether to also return the rewirings, as arrays (i, j, h) of
+              the moves of the edges (i[m], j[m]) to (i[m], h[m]). Applied
+              one after the other to NetworkRingLattice(N, k), e.g. by
+              IncrementalGraphMetrics.rewire, they never duplicate an edge,
+              and give the returned network.
     """
 
     # Create a regular string lattice
-    CIJ = NetworkRingLattice(N, k)
-
-    # Loop over all connections and swap each of them with probability p
-    for i in range(N):
-        for j in range(i + 1, N):
-            if CIJ[i, j] and rn.random() < p:
-                # We modify connections in both directions (i.e. [i,j] and [j,i])
-                # to maintain network undirectedness (i.e. symmetry).
-                CIJ[i, j] = 0
-                CIJ[j, i] = 0
-
-                h = int(np.mod(i + np.ceil(rn.random() * (N - 1)) - 1, N))
-                CIJ[i, h] = 1
-                CIJ[h, i] = 1
-
-    return(CIJ)
+    i, j = RingLatticeEdges(N, k)
+
+    rewired = rn.random(len(i)) < p
+
+    # Kept edges go first, so that a rewired edge never displaces one
+    i = np.append(i[~rewired], i[rewired])
+    j = np.append(j[~rewired], j[rewired])
+
+    lattice_j = j.copy()
+
+    # A complete graph has nowhere to rewire to
+    if len(i) < N * (N - 1) // 2:
+        to_draw = np.arange(len(i) - np.sum(rewired), len(i))
+
+        for attempt in range(100):
+            if len(to_draw) == 0:
+                break
+
+            j[to_draw] = (i[to_draw] + rn.randint(1, N, size=len(to_draw))) % N
+            to_draw = _DuplicateEdges(N, i, j)
+        else:
+            _DrawFreeEndpoints(N, i, j, to_draw)
+
+    connectivity = EdgesToConnectivity(N, np.minimum(i, j), np.maximum(i, j), output)
+
+    if moves:
+        first = len(i) - np.sum(rewired)
+        return connectivity, _OrderedMoves(N, i[first:], lattice_j[first:], j[first:])
+
+    return connectivity
+
+
+def _OrderedMoves(N, i, j, h):
+    """
+    Orders the moves of the edges (i[m], j[m]) to (i[m], h[m]) so that,
+    applied one after the other, a move only lands on an edge of the
+    lattice once that edge has moved away. Moves back to their own edge,
+    and cycles of moves that only swap edges among themselves, leave the
+    network unchanged and are dropped.
+    """
+
+    def Key(a, b):
+        return min(a, b) * N + max(a, b)
+
+    moved = [m for m in range(len(i)) if h[m] != j[m]]
+    vacated_by = dict((Key(i[m], j[m]), m) for m in moved)
+
+    # waiting_on[m] is the move that has to vacate the edge move m lands on
+    waiting_on = dict((m, vacated_by.get(Key(i[m], h[m]))) for m in moved)
+    waited_on_by = dict((waiting_on[m], m) for m in moved if waiting_on[m] is not None)
+
+    order = []
+
+    for m in moved:
+        if waiting_on[m] is not None:
+            continue
+
+        # Follow the chain of moves, each into the edge the last one left
+        while m is not None:
+            order.append(m)
+            m = waited_on_by.get(m)
+
+    order = np.array(order, dtype=int)
+
+    return i[order], j[order], h[order]
+
+
+def _DrawFreeEndpoints(N, i, j, to_draw):
+    """
+    Redraws j[e] for every edge e in to_draw, one edge at a time, uniformly
+    from the nodes that i[e] is not connected to by any other edge
+    """
+
+    pending = np.zeros(len(i), dtype=bool)
+    pending[to_draw] = True
+
+    for e in to_draw:
+        others = ~pending
+        others[e] = False
+
+        connected = np.append(j[others & (i == i[e])], i[others & (j == i[e])])
+        free = np.setdiff1d(np.arange(N), np.append(connected, i[e]))
+
+        if len(free) == 0:
+            raise ValueError("Node " + str(i[e]) + " is connected to every other node, and has nowhere to rewire to")
+
+        j[e] = free[rn.randint(len(free))]
+        pending[e] = False
+
+
+def _DuplicateEdges(N, i, j):
+    """
+    Indexes of the edges that repeat an edge listed earlier
+    """
+
+    edges = np.minimum(i, j) * N + np.maximum(i, j)
+    order = np.argsort(edges, kind='mergesort')
+
+    repeats = np.where(np.diff(edges[order]) == 0)[0] + 1
+
+    return order[repeats]
@@ -6,31 +6,34 @@ Exercise 3
 """
 
 import numpy as np
-from bct import breadthdist, charpath, clustering_coef_bu
+from GraphMetrics import GraphMetrics
 
 
-def SmallWorldIndex(CIJ):
+def SmallWorldIndex(CIJ, metrics=None, samples=None):
     """
     Computes the small-world index of the graph with connection matrix CIJ.
     Self-connections are ignored, as they are cyclic paths.
 
     Inputs:
-    CIJ  --  Graph connectivity matrix. Must be binary (0 or 1) and undirected.
+    CIJ     --  Graph connectivity matrix, dense or scipy.sparse. Must be
+                binary (0 or 1) and undirected.
+    metrics --  GraphMetrics(CIJ), when it has already been computed
+    samples --  Number of random sources to estimate the path length from,
+                for graphs too large for all-pairs distances. See
+                GraphMetrics.
     """
 
-    N = len(CIJ)
-    K = np.sum(np.sum(CIJ)) / len(CIJ)  # average degree
+    if metrics is None:
+        metrics = GraphMetrics(CIJ, samples=samples)
 
-    # Clustering coefficient
-    CC = np.mean(clustering_coef_bu(CIJ))
+    N = CIJ.shape[0]
+    K = np.sum(metrics['degree']) / float(N)  # average degree
 
-    # Distance matrix
-    [RR, DD] = breadthdist(CIJ)
+    # Clustering coefficient
+    CC = np.mean(metrics['clustering'])
 
-    # Note: the charpath implementation of bctpy is not very robust. Expect
-    # some warnings. From the output of charpath use only the characteristic
-    # path length
-    PL = charpath(DD, include_diagonal=False)[0]
+    # Characteristic path length
+    PL = metrics['path_length']
 
     # Calculate small-world index
     CCs = CC / (K / N)
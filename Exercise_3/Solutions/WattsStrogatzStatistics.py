@@ -14,8 +14,10 @@ sys.path.append('..')
 
 import numpy as np
 import matplotlib.pyplot as plt
-import bct
+from GraphMetrics import GraphMetrics
+from IncrementalGraphMetrics import IncrementalGraphMetrics
 from SmallWorldIndex import SmallWorldIndex
+from NetworkRingLattice import NetworkRingLattice
 from NetworkWattsStrogatz import NetworkWattsStrogatz
 
 # Set up parameter values
@@ -33,9 +35,23 @@ Eloc  = np.zeros(nb_trials)
 for i, p in enumerate(prob):
   CIJ = NetworkWattsStrogatz(N, k, p)
 
-  SWI[i]   = SmallWorldIndex(CIJ)
-  Eglob[i] = bct.efficiency_wei(CIJ, local=False)
-  Eloc[i]  = np.mean(bct.efficiency_wei(CIJ, local=True))
+  metrics  = GraphMetrics(CIJ)
+
+  SWI[i]   = SmallWorldIndex(CIJ, metrics)
+  Eglob[i] = metrics['global_efficiency']
+  Eloc[i]  = np.mean(metrics['local_efficiency'])
+
+# Trace the clustering of one network edge by edge, as its lattice is
+# rewired with probability 1
+CIJ, (mi, mj, mh) = NetworkWattsStrogatz(N, k, 1.0, moves=True)
+
+tracker = IncrementalGraphMetrics(NetworkRingLattice(N, k))
+Ctrace  = np.zeros(len(mi) + 1)
+Ctrace[0] = tracker.mean_clustering
+
+for m in xrange(len(mi)):
+  tracker.rewire(mi[m], mj[m], mh[m])
+  Ctrace[m + 1] = tracker.mean_clustering
 
 # Plot figures
 plt.figure(1)
@@ -52,5 +68,10 @@ plt.subplot(212)
 plt.semilogx(prob, Eloc, marker='.', linestyle='none')
 plt.xlabel('Rewiring probability')
 plt.ylabel('Local efficiency')
+
+plt.figure(3)
+plt.plot(np.arange(len(Ctrace)), Ctrace)
+plt.xlabel('Edges rewired')
+plt.ylabel('Mean clustering coefficient')
 plt.show()
 
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+import argparse
+import time
+
+import numpy as np
+from neuro.HodgkinHuxleyLayer import HodgkinHuxleyLayer
+from neuro.Integrators import INTEGRATORS
+from neuro.IzhikevichLayer import IzhikevichLayer
+from neuro.QuadraticLayer import QuadraticLayer
+
+LAYERS = {
+    'hodgkin_huxley': HodgkinHuxleyLayer,
+    'izhikevich': IzhikevichLayer,
+    'quadratic': QuadraticLayer,
+}
+
+
+def run_layer(layer_class, integrator, dt, currents, seed, **layer_kwargs):
+    """
+    Drives an uncoupled layer with the given [t, neuron] input currents, returning the seconds spent
+    ticking it and its firings. Neuron parameters are drawn from the seed, so every run of the same
+    layer class simulates the same neurons. Any further keyword arguments are passed to the layer.
+    """
+
+    np.random.seed(seed)
+    layer = layer_class(currents.shape[1], integrator=integrator, dt=dt, **layer_kwargs)
+
+    start = time.time()
+
+    # Large steps can diverge, which shows up as error rather than needing a warning
+    with np.errstate(over='ignore', invalid='ignore'):
+        for t in xrange(len(currents)):
+            layer.I = currents[t]
+            layer.tick(dt, t)
+
+    return time.time() - start, layer.firings
+
+
+def spike_time_error(firings, reference, n):
+    """
+    Compares firings with reference firings of the same n neurons. Returns the mean absolute
+    difference in ms between each spike and the nearest reference spike of the same neuron, and the
+    difference in spike counts summed over neurons, as a fraction of the reference spikes.
+    """
+
+    def by_neuron(firings):
+        firings = firings[np.lexsort((firings[:, 0], firings[:, 1]))]
+        return np.split(firings[:, 0], np.searchsorted(firings[:, 1], np.arange(1, n)))
+
+    differences, miscounted = [], 0
+
+    for times, reference_times in zip(by_neuron(firings), by_neuron(reference)):
+        miscounted += abs(len(times) - len(reference_times))
+
+        if len(times) == 0 or len(reference_times) == 0:
+            continue
+
+        after = np.clip(np.searchsorted(reference_times, times), 0, len(reference_times) - 1)
+        before = np.clip(after - 1, 0, len(reference_times) - 1)
+
+        differences.append(np.minimum(np.abs(times - reference_times[before]),
+                                      np.abs(times - reference_times[after])))
+
+    mean_difference = np.concatenate(differences).mean() if len(differences) > 0 else 0.0
+
+    return mean_difference, float(miscounted) / max(len(reference), 1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Reports spike-time error against throughput for every integrator')
+
+    parser.add_argument('-l', '--layer', choices=sorted(LAYERS.keys()), default='izhikevich',
+                        help='neuron model to benchmark')
+    parser.add_argument('-n', '--neurons', type=int, default=1000,
+                        help='number of neurons in the layer')
+    parser.add_argument('-d', '--duration', type=int, default=1000,
+                        help='simulation duration in ms')
+    parser.add_argument('-m', '--mean-current', type=float, default=4,
+                        help='mean of the random input current')
+    parser.add_argument('-v', '--current-sd', type=float, default=5,
+                        help='standard deviation of the random input current')
+    parser.add_argument('-r', '--reference-dt', type=float, default=0.01,
+                        help='step size of the rk4 reference run')
+    parser.add_argument('-s', '--seed', type=int, default=0,
+                        help='seed of the neuron parameters and input currents')
+
+    parser.add_argument('dts', metavar='dt', type=float, nargs='*', default=[0.1, 0.2, 0.5, 1.0],
+                        help='step sizes to benchmark every integrator at')
+
+    args = parser.parse_args()
+
+    layer_class = LAYERS[args.layer]
+    noise = np.random.RandomState(args.seed).randn(args.duration, args.neurons)
+    currents = args.mean_current + args.current_sd * noise
+
+    reference = run_layer(layer_class, 'rk4', args.reference_dt, currents, args.seed)[1]
+    baseline_seconds = run_layer(layer_class, 'rk4', 0.2, currents, args.seed)[0]
+
+    print('Reference: rk4 at dt=' + str(args.reference_dt) + ', ' + str(len(reference)) + ' spikes')
+    print('Speedup is relative to rk4 at dt=0.2, the default\n')
+    print('{:<18} {:>5} {:>9} {:>14} {:>8} {:>12} {:>9}'.format(
+        'integrator', 'dt', 'seconds', 'neuron-ms/s', 'speedup', 'error (ms)', 'miscount'))
+
+    for integrator in sorted(INTEGRATORS.keys()):
+        for dt in args.dts:
+            try:
+                seconds, firings = run_layer(layer_class, integrator, dt, currents, args.seed)
+            except StandardError as error:
+                print('{:<18} {:>5}   rejected: {}'.format(integrator, dt, error))
+                continue
+
+            mean_difference, miscounted = spike_time_error(firings, reference, args.neurons)
+
+            print('{:<18} {:>5} {:>9.3f} {:>14.0f} {:>7.2f}x {:>12.3f} {:>8.1%}'.format(
+                integrator, dt, seconds, args.neurons * args.duration / seconds, baseline_seconds / seconds,
+                mean_difference, miscounted))
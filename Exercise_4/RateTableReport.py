@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+import argparse
+import time
+
+import numpy as np
+from IntegratorBenchmark import run_layer, spike_time_error
+from neuro.HodgkinHuxleyLayer import GatingRateTable, HodgkinHuxleyLayer, gating_rates
+
+RATE_NAMES = ['alpha_m', 'beta_m', 'alpha_n', 'beta_n', 'alpha_h', 'beta_h']
+
+
+def rate_errors(table, v):
+    """
+    Largest absolute error of each tabulated rate over the voltages v, relative to the largest
+    exact value of that rate
+    """
+
+    exact = np.array(gating_rates(v))
+
+    return np.max(np.abs(table(v) - exact), axis=1) / np.max(np.abs(exact), axis=1)
+
+
+def time_rates(rates, v, repeats=100):
+    """
+    Seconds taken to evaluate the rates over the voltages v, averaged over the repeats
+    """
+
+    start = time.time()
+
+    for repeat in xrange(repeats):
+        rates(v)
+
+    return (time.time() - start) / repeats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Reports the accuracy and speed of tabulated gating rates')
+
+    parser.add_argument('-n', '--neurons', type=int, default=1000,
+                        help='number of neurons in the layer')
+    parser.add_argument('-d', '--duration', type=int, default=500,
+                        help='simulation duration in ms')
+    parser.add_argument('-i', '--integrator', default='rk4',
+                        help='integrator of the layer')
+    parser.add_argument('-t', '--dt', type=float, default=0.05,
+                        help='step size of the layer')
+    parser.add_argument('-m', '--mean-current', type=float, default=6,
+                        help='mean of the random input current')
+    parser.add_argument('-v', '--current-sd', type=float, default=5,
+                        help='standard deviation of the random input current')
+    parser.add_argument('-s', '--seed', type=int, default=0,
+                        help='seed of the input currents')
+
+    parser.add_argument('resolutions', metavar='resolution', type=float, nargs='*', default=[1, 0.1, 0.01],
+                        help='mV between tabulated voltages')
+
+    args = parser.parse_args()
+
+    # Voltages spanning the trajectory of a spike, from the after-hyperpolarisation to the peak
+    v = np.random.RandomState(args.seed).uniform(-20, 120, args.neurons)
+    exact_seconds = time_rates(gating_rates, v)
+
+    print('Gating rates over ' + str(args.neurons) + ' voltages in [-20, 120]mV, exact in ' +
+          '{:.1f}us\n'.format(1e6 * exact_seconds))
+    print('{:>10} {:>9} '.format('mV', 'speedup') + ' '.join('{:>9}'.format(name) for name in RATE_NAMES))
+
+    for resolution in args.resolutions:
+        table = GatingRateTable(resolution)
+
+        print('{:>10} {:>8.2f}x '.format(resolution, exact_seconds / time_rates(table, v)) +
+              ' '.join('{:>9.1e}'.format(error) for error in rate_errors(table, v)))
+
+    noise = np.random.RandomState(args.seed).randn(args.duration, args.neurons)
+    currents = args.mean_current + args.current_sd * noise
+
+    exact_seconds, reference = run_layer(HodgkinHuxleyLayer, args.integrator, args.dt, currents, args.seed)
+
+    print('\n' + str(args.neurons) + ' neurons for ' + str(args.duration) + 'ms with ' + args.integrator +
+          ' at dt=' + str(args.dt) + ', exact in {:.3f}s with '.format(exact_seconds) +
+          str(len(reference)) + ' spikes\n')
+    print('{:>10} {:>9} {:>8} {:>12} {:>9}'.format('mV', 'seconds', 'speedup', 'error (ms)', 'miscount'))
+
+    for resolution in args.resolutions:
+        seconds, firings = run_layer(HodgkinHuxleyLayer, args.integrator, args.dt, currents, args.seed,
+                                     rate_resolution=resolution)
+        mean_difference, miscounted = spike_time_error(firings, reference, args.neurons)
+
+        print('{:>10} {:>9.3f} {:>7.2f}x {:>12.3f} {:>8.1%}'.format(
+            resolution, seconds, exact_seconds / seconds, mean_difference, miscounted))
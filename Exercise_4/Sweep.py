@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+
+import argparse
+
+from Q1 import build_network
+from neuro.ParameterSweep import run_sweep
+
+parser = argparse.ArgumentParser(description='Runs the Q1 simulation for many rewiring probabilities')
+
+parser.add_argument('-d', '--duration', type=int, default=1000,
+                    help='simulation duration of each job')
+parser.add_argument('-o', '--out', default='sweep',
+                    help='directory to write spike logs and summary.csv to')
+parser.add_argument('-j', '--processes', type=int, default=None,
+                    help='number of worker processes, defaults to the number of cores')
+parser.add_argument('-s', '--seed', type=int, default=0,
+                    help='seed from which the seed of every job is derived')
+
+parser.add_argument('rewiring_p', metavar='p', type=float, nargs='+',
+                    help='rewiring probability')
+
+args = parser.parse_args()
+
+for summary in run_sweep(build_network, {'rewiring_p': args.rewiring_p}, args.duration, args.out,
+                         processes=args.processes, seed=args.seed, bg_lam=0.01, bg_scale=15):
+    print('Finished job ' + str(summary['job']) + ' with p=' + str(summary['rewiring_p']))
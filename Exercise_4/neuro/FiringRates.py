@@ -0,0 +1,57 @@
+import numpy as np
+
+
+def spike_histogram(firings, duration, group_size=1, no_of_groups=None):
+    """
+    Counts the firings of every group of neurons in every ms with a single bincount, returning a
+    [duration, no_of_groups] array. Group g is the neurons g * group_size to (g + 1) * group_size - 1,
+    e.g. a module of a modular layer.
+
+    firings -- array of [t, neuron_index] rows, as recorded by a layer
+    duration -- number of ms to count, firings at or after it are left out
+    no_of_groups -- defaults to enough groups for the highest neuron index, firings of neurons
+                    beyond the last group are left out
+    """
+
+    firings = np.reshape(firings, (-1, 2)).astype(np.int64)
+    times, groups = firings[:, 0], firings[:, 1] // group_size
+
+    if no_of_groups is None:
+        no_of_groups = np.max(groups) + 1 if len(groups) > 0 else 1
+
+    counted = (times >= 0) & (times < duration) & (groups < no_of_groups)
+
+    counts = np.bincount(times[counted] * no_of_groups + groups[counted], minlength=duration * no_of_groups)
+
+    return counts.reshape(duration, no_of_groups)
+
+
+def window_counts(histogram, window, ends):
+    """
+    Sums a histogram from spike_histogram over the window ms before each of the given end times,
+    i.e. over start <= t < end with start = end - window, using one cumulative sum for all windows.
+    Returns a [len(ends), no_of_groups] array. Parts of windows outside the histogram count as empty.
+    """
+
+    cumulative = np.vstack([np.zeros((1, histogram.shape[1]), dtype=histogram.dtype),
+                            np.cumsum(histogram, axis=0)])
+
+    ends = np.clip(np.asarray(ends), 0, len(histogram))
+    starts = np.clip(ends - window, 0, len(histogram))
+
+    return cumulative[ends] - cumulative[starts]
+
+
+def mean_firing_rates(firings, window, ends, group_size=1, no_of_groups=None):
+    """
+    Mean firing rate in Hz of the neurons of every group over the window ms before each of the given
+    end times, see spike_histogram and window_counts. Costs O(spikes + duration * no_of_groups)
+    however many windows there are.
+    """
+
+    ends = np.asarray(ends)
+    duration = int(np.max(ends)) if len(ends) > 0 else 0
+
+    histogram = spike_histogram(firings, duration, group_size, no_of_groups)
+
+    return window_counts(histogram, window, ends) * 1000.0 / (window * group_size)
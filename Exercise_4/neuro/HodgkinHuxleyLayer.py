@@ -0,0 +1,172 @@
+from NeuronNetworkLayer import NeuronNetworkLayer
+from Integrators import INTEGRATORS
+import numpy as np
+
+GNa = 120.0
+ENa = 115.0
+
+GK = 36.0
+EK = -12.0
+
+GL = 0.3
+EL = 10.6
+
+C = 1.0
+
+
+def gating_rates(v):
+
+    """
+    Computes the opening and closing rates of the m, n and h gates for the array values of v,
+    returning alpha_m, beta_m, alpha_n, beta_n, alpha_h, beta_h
+    """
+
+    alpha_m = (2.5 - 0.1 * v) / (np.exp(2.5 - 0.1 * v) - 1)
+    beta_m = 4.0 * np.exp(-v / 18.0)
+
+    alpha_n = (0.1 - 0.01 * v) / (np.exp(1.0 - 0.1 * v) - 1)
+    beta_n = 0.125 * np.exp(-v / 80.0)
+
+    alpha_h = 0.07 * np.exp(-v / 20.0)
+    beta_h = 1.0 / (np.exp(3.0 - 0.1 * v) + 1.0)
+
+    return alpha_m, beta_m, alpha_n, beta_n, alpha_h, beta_h
+
+
+class GatingRateTable(object):
+
+    """
+    Gating rates tabulated over a grid of voltages, so that looking them up costs a linear
+    interpolation rather than six exponentials. Voltages outside [v_min, v_max] take the rates at
+    the nearest end of the grid.
+
+    resolution -- mV between tabulated voltages
+    """
+
+    def __init__(self, resolution=0.01, v_min=-100.0, v_max=150.0):
+        self.resolution = resolution
+        self.v_min = v_min
+
+        v = v_min + resolution * np.arange(int(np.ceil((v_max - v_min) / resolution)) + 1)
+
+        with np.errstate(invalid='ignore'):
+            rates = np.array(gating_rates(v))
+
+        # alpha_m and alpha_n are 0/0 at single voltages, where they take the limit of their neighbours
+        for rate in rates:
+            defined = np.isfinite(rate)
+            rate[~defined] = np.interp(v[~defined], v[defined], rate[defined])
+
+        # Row k holds the six rates at the k-th voltage followed by their slopes up to the next, so that
+        # an interpolation gathers one contiguous row per neuron
+        slopes = np.diff(rates, axis=1)
+        self.table = np.ascontiguousarray(np.vstack([rates, np.hstack([slopes, slopes[:, -1:]])]).T)
+
+    def __call__(self, v):
+        """
+        Interpolates the six gating rates for the array values of v, in the order of gating_rates
+        """
+
+        position = np.clip((v - self.v_min) / self.resolution, 0, len(self.table) - 1)
+        index = position.astype(int)
+
+        rows = self.table.take(index, axis=0)
+
+        return (rows[:, :6] + rows[:, 6:] * (position - index)[:, np.newaxis]).T
+
+
+class HodgkinHuxleyLayer(NeuronNetworkLayer):
+
+    """
+    Implements a population of Hodgkin-Huxley neurons, assuming a resting potential of 0mV as in
+    the 1952 paper.
+
+    The state of the population is held as a structure of arrays, the rows v, m, n and h of
+    self.state, with V, m, n and h as views of those rows. The whole state is integrated together
+    by the layer's integrator. There is no reset, so a neuron fires when V crosses the fire
+    threshold on its way up.
+
+    RK4 needs small steps to stay stable on Hodgkin-Huxley dynamics, hence the default dt of 0.05ms.
+    The exponential Euler integrator remains stable at 0.1-0.2ms, for a few percent of spikes.
+
+    rate_resolution -- when given, gating rates are interpolated from a GatingRateTable with this
+                       many mV between tabulated voltages, instead of being computed exactly
+    """
+
+    def __init__(self, n, fire_threshold=50, integrator='rk4', dt=0.05, v0=0, rate_resolution=None):
+        super(HodgkinHuxleyLayer, self).__init__(n, integrator=integrator, dt=dt)
+
+        self.rate_table = None if rate_resolution is None else GatingRateTable(rate_resolution)
+
+        # Gates start at their steady state for v0
+        alpha_m, beta_m, alpha_n, beta_n, alpha_h, beta_h = gating_rates(v0 * np.ones(n))
+
+        self.state = np.array([v0 * np.ones(n),
+                               alpha_m / (alpha_m + beta_m),
+                               alpha_n / (alpha_n + beta_n),
+                               alpha_h / (alpha_h + beta_h)])
+
+        self.V = self.state[0]
+        self.fire_threshold = fire_threshold
+
+        self._above_threshold = self.V >= fire_threshold
+
+    @property
+    def m(self):
+        return self.state[1]
+
+    @property
+    def n(self):
+        return self.state[2]
+
+    @property
+    def h(self):
+        return self.state[3]
+
+    def _step_membrane_potential(self, dt, t):
+        self.state[...] = INTEGRATORS[self.integrator](self.state, self._derivatives, dt, self._jacobian)
+
+    def _derivatives(self, state):
+        """
+        Computes d/dt of every row of the given state
+        """
+
+        v, m, n, h = state
+        alpha_m, beta_m, alpha_n, beta_n, alpha_h, beta_h = self._gating_rates(v)
+
+        Ik = GNa * (m ** 3) * h * (v - ENa) + GK * (n ** 4) * (v - EK) + GL * (v - EL)
+
+        return np.array([(self.I - Ik) / C,
+                         alpha_m * (1 - m) - beta_m * m,
+                         alpha_n * (1 - n) - beta_n * n,
+                         alpha_h * (1 - h) - beta_h * h])
+
+    def _jacobian(self, state):
+        """
+        Computes the derivative of d/dt of every row of the given state with respect to that row
+        """
+
+        v, m, n, h = state
+        alpha_m, beta_m, alpha_n, beta_n, alpha_h, beta_h = self._gating_rates(v)
+
+        return np.array([-(GNa * (m ** 3) * h + GK * (n ** 4) + GL) / C,
+                         -(alpha_m + beta_m),
+                         -(alpha_n + beta_n),
+                         -(alpha_h + beta_h)])
+
+    def _gating_rates(self, v):
+        if self.rate_table is None:
+            return gating_rates(v)
+
+        return self.rate_table(v)
+
+    def _fired_neurons(self):
+        above_threshold = self.V >= self.fire_threshold
+        fired_neurons = np.where(above_threshold & ~self._above_threshold)[0]
+
+        self._above_threshold = above_threshold
+
+        return fired_neurons
+
+    def _reset_neurons(self, neuron_indexes):
+        pass
@@ -0,0 +1,74 @@
+"""
+Integration schemes for the membrane potential of a layer, keyed by name in INTEGRATORS.
+
+Every scheme has the signature step(V, dvdt, dt, jacobian) and returns V projected forward by dt,
+where dvdt(V) gives dV/dt with the rest of the layer's state held fixed, and jacobian(V) gives its
+derivative with respect to V. Only exponential_euler makes use of the jacobian.
+
+Examples
+========
+
+INTEGRATORS['rk4'](V, lambda V: 0.04 * V ** 2 + 5 * V + 140 - U + I, 0.2, None)
+IzhikevichLayer(800, integrator='exponential_euler', dt=1.0)
+"""
+
+import numpy as np
+
+
+def euler(V, dvdt, dt, jacobian=None):
+
+    """
+    Forward Euler method, one evaluation of dV/dt per step
+    """
+
+    return V + dt * dvdt(V)
+
+
+def rk2(V, dvdt, dt, jacobian=None):
+
+    """
+    Second order Runge-Kutta (midpoint) method, two evaluations of dV/dt per step
+    """
+
+    k1 = dvdt(V)
+    k2 = dvdt(V + 0.5 * dt * k1)
+
+    return V + dt * k2
+
+
+def rk4(V, dvdt, dt, jacobian=None):
+
+    """
+    Fourth order Runge-Kutta method, four evaluations of dV/dt per step
+    """
+
+    k1 = dvdt(V)
+    k2 = dvdt(V + 0.5 * dt * k1)
+    k3 = dvdt(V + 0.5 * dt * k2)
+    k4 = dvdt(V + dt * k3)
+
+    return V + (dt / 6) * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def exponential_euler(V, dvdt, dt, jacobian):
+
+    """
+    Exponential Euler method, which linearises dV/dt about V and integrates the linear part exactly,
+    V + (exp(J * dt) - 1) / J * dV/dt. Stable for much larger steps than Euler on stiff dynamics.
+    """
+
+    J = jacobian(V)
+
+    # (exp(J * dt) - 1) / J tends to dt as J tends to 0
+    linear = np.abs(J * dt) < 1e-8
+    step = np.where(linear, dt, np.expm1(J * dt) / np.where(linear, 1, J))
+
+    return V + step * dvdt(V)
+
+
+INTEGRATORS = {
+    'euler': euler,
+    'rk2': rk2,
+    'rk4': rk4,
+    'exponential_euler': exponential_euler,
+}
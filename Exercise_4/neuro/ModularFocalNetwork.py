@@ -2,26 +2,25 @@
 Examples
 ========
 
-ModularFocalNetwork(8, [1600, 800], 4).plot() => 8 modules, 4 connections to each neuron
+ModularFocalNetwork(8, [1600, 800], 4).plot()                   => 8 modules, 4 connections to each neuron
+ModularFocalNetwork(8, [200, 80000], 4, dense=False).synapses() => straight to SparseSynapses
 """
 
 import numpy as np
 from Plotters import plot_connectivity_matrix
-
-
-def range_from_base(base, size):
-    return xrange(base, base + size)
+from SparseSynapses import SparseSynapses
 
 
 class ModularFocalNetwork(object):
 
-    def __init__(self, C, dim, focal_width):
+    def __init__(self, C, dim, focal_width, dense=True):
         """
         Generates connectivity matrix for a modular network with...
 
         C -- # communities/modules
         dim -- dimensions of matrix, [nodes_in_target_layer, nodes_in_input_layer]
         focal_width -- how connections per node in target layer
+        dense -- whether to build the dense CIJ, otherwise only the edge list is kept
 
         Each community will have an even number of nodes, where each node has focal_width
         connections from randomly chosen nodes in the input layer.
@@ -33,28 +32,58 @@ class ModularFocalNetwork(object):
         self.dim = dim
         self.module_dim = [layer_size / C for layer_size in dim]
         self.focal_width = focal_width
-        self.CIJ = np.zeros(dim)
 
-        for i in range(C):
-            self.init_module(i)
+        modules = [self.init_module(i) for i in range(C)]
+        self.targets = np.concatenate([targets for targets, sources in modules])
+        self.sources = np.concatenate([sources for targets, sources in modules])
+
+        self.CIJ = self.to_dense() if dense else None
 
     def init_module(self, module_index):
         """
-        Initialises the target module with connections from the input layer.
+        Connects every node of the target module to focal_width distinct nodes of the input module,
+        returning the (targets, sources) of the connections.
         """
 
         target_dim, input_dim = self.module_dim
 
-        input_nodes = range_from_base(module_index * input_dim, input_dim)
-        target_nodes = range_from_base(module_index * target_dim, target_dim)
+        # The input nodes holding the focal_width smallest of a row of random keys are a uniformly
+        # random choice without replacement, made for every target node at once
+        keys = np.random.random_sample((target_dim, input_dim))
+        sources = np.argpartition(keys, self.focal_width - 1, axis=1)[:, :self.focal_width]
+
+        targets = np.repeat(np.arange(target_dim), self.focal_width)
+
+        return module_index * target_dim + targets, module_index * input_dim + sources.ravel()
+
+    def edges(self):
+        """
+        Returns the (targets, sources) of every connection, where connection k runs from node
+        sources[k] in the input layer to node targets[k] in the target layer
+        """
+
+        return self.targets, self.sources
+
+    def synapses(self, delay=1):
+        """
+        Returns the connections as SparseSynapses, all of strength 1 and the given delay
+        """
+
+        return SparseSynapses.from_edges(self.dim, self.targets, self.sources, 1, delay)
+
+    def to_dense(self):
+        """
+        Returns the connections as a dense connectivity matrix
+        """
+
+        CIJ = np.zeros(self.dim)
+        CIJ[self.targets, self.sources] = 1
 
-        for i in target_nodes:
-            nodes_to_connect = np.random.choice(input_nodes, self.focal_width, replace=False)
-            self.CIJ[i, nodes_to_connect] = 1
+        return CIJ
 
     def plot(self):
         """
         Uses pyplot to draw a plot of the connectivity matrix
         """
 
-        plot_connectivity_matrix(self.CIJ, self.dim).show()
+        plot_connectivity_matrix(self.to_dense() if self.CIJ is None else self.CIJ, self.dim).show()
@@ -1,19 +1,24 @@
 import numpy as np
 from NeuronNetwork import add_dirac_pulse
+from Recorders import ArrayRecorder
 
 
-def simulate(net, duration, base_current=0, bg_lam=0, bg_scale=0):
+def simulate(net, duration, base_current=0, bg_lam=0, bg_scale=0, progress=True, recorder=None):
     """
     Simulates the given network in action for the given duration, graphing the neuron spikes of the
-    different layers.
+    different layers. Prints the time every 100ms if progress is set.
+
+    recorder -- Recorder for the membrane potentials, whose result is returned alongside the network.
+                Defaults to recording every neuron at every ms, giving VS[layer_index][t].
     """
 
-    VS = [np.zeros([duration, net.layers[idx].N]) for idx in range(len(net.layers))]
+    recorder = ArrayRecorder(dtype=float) if recorder is None else recorder
+    recorder.start(net, duration)
 
     for t in xrange(duration):
 
         # Progress marker
-        if t % 100 == 0:
+        if progress and t % 100 == 0:
             print(t)
 
         net.layers[0].I = base_current * np.ones(net.layers[0].N)
@@ -25,11 +30,51 @@ def simulate(net, duration, base_current=0, bg_lam=0, bg_scale=0):
             net.layers[layer_index].I = np.zeros(net.layers[layer_index].N)
 
         net.tick(t)
+        recorder.record(t, net)
+
+    return recorder.finish(), net
+
+
+def simulate_ensemble(ensemble, duration, base_current=0, bg_lam=0, bg_scale=0):
+    """
+    Simulates every network of a NeuronNetworkEnsemble in lock-step for the given duration, driving
+    the first layer of each as simulate does. base_current, bg_lam and bg_scale may be given per
+    network, as arrays of length B.
+
+    Returns VS[layer_index] of shape [duration, B, N] along with the member networks, which hold
+    their own firings afterwards.
+    """
+
+    first_layer = ensemble.layer_slice(0)
+    B, N0 = ensemble.batch_size, ensemble.layers[0].N
+
+    base_current = np.broadcast_to(np.reshape(base_current, (-1, 1)), (B, 1))
+    bg_lam = np.broadcast_to(np.reshape(bg_lam, (-1, 1)), (B, N0))
+    bg_scale = np.broadcast_to(np.reshape(bg_scale, (-1, 1)), (B, N0))
+
+    VS = [np.zeros([duration, B, ensemble.layers[idx].N]) for idx in range(len(ensemble.layers))]
+
+    for t in xrange(duration):
+
+        # Progress marker
+        if t % 100 == 0:
+            print(t)
+
+        ensemble.I[:] = 0
+        ensemble.I[:, first_layer] = base_current
+
+        random_spikes = np.random.poisson(lam=bg_lam) > 0
+        ensemble.I[:, first_layer] += random_spikes * bg_scale
+
+        ensemble.tick(t)
+
+        for layer_index in range(len(ensemble.layers)):
+            VS[layer_index][t] = ensemble.V[:, ensemble.layer_slice(layer_index)]
 
-        for layer_index in range(len(net.layers)):
-            VS[layer_index][t] = net.layers[layer_index].V
+    networks = ensemble.unpack_firings()
 
-    for layer_index, layer in net.layers.items():
-        add_dirac_pulse(VS[layer_index], layer.firings)
+    for layer_index in range(len(ensemble.layers)):
+        for b, net in enumerate(networks):
+            add_dirac_pulse(VS[layer_index][:, b], net.layers[layer_index].firings)
 
-    return VS, net
+    return VS, networks
@@ -1,5 +1,6 @@
 import numpy as np
 from NeuronNetworkLayer import NeuronNetworkLayer
+from SparseSynapses import SparseSynapses
 
 
 def add_dirac_pulse(V, firings, dirac_pulse=30):
@@ -28,22 +29,29 @@ class NeuronNetwork(object):
             from_layer, to_layer = layers[layer_index - 1:layer_index + 1]
             layer_scaling_factor = scaling_factor / np.sqrt(from_layer.N)
 
-            net.connect_layers([from_layer, to_layer], scaling_factor=layer_scaling_factor)
+            net.connect_layers([to_layer, from_layer], scaling_factor=layer_scaling_factor)
 
         return net
 
-    def __init__(self, neuron_layers, d_max=25):
+    def __init__(self, neuron_layers, d_max=25, dt=0.2):
         """
         Initialises the neuron network with given layers.
 
         neuron_layers -- collection of neuron layer objects (Quadratic, HodgkinHuxley, Izkevich)
+        dt -- step size in ms of the layers that don't have a step size of their own
         """
 
         self.layers = dict(zip(range(len(neuron_layers)), neuron_layers))
 
-        self.dt = 0.2
+        self.dt = dt
         self.d_max = d_max
 
+        # input_buffers[n][d % (d_max + 1)] accumulates the synaptic input due to arrive at layer n
+        # at time d. Spikes are scattered into the buffer once when they fire, so collecting the
+        # input for time t is a read of a single slot.
+        self.input_buffers = dict((index, np.zeros((d_max + 1, layer.N)))
+                                  for index, layer in self.layers.items())
+
     def tick(self, t):
         """
         Advances the simulation by one step on all layers
@@ -61,18 +69,14 @@ class NeuronNetwork(object):
         """
 
         layer = self.layers[layer_index]
+        input_buffer = self.input_buffers[layer_index]
+        slot = t % len(input_buffer)
 
-        for input_layer_index, S in layer.S.iteritems():
-            input_layer = self.layers[input_layer_index]
-
-            delay = layer.delay[input_layer_index]
-            scaling_factor = layer.factor[input_layer_index]
-
-            for (firing_time, neuron_index) in input_layer.firings_after(t - self.d_max):
-                idx = np.where(delay[:, neuron_index] == (t - firing_time))[0]
-                layer.I[idx] += scaling_factor * S[idx, neuron_index]
+        layer.I = layer.I + input_buffer[slot]
+        input_buffer[slot] = 0
 
-        layer.tick(self.dt, t)
+        fired_neurons = layer.tick(self.dt, t)
+        self._scatter_spikes(layer_index, fired_neurons, t)
 
     def connect_layers(self, layers, scaling_factor=None, delay=None, S=None):
         """
@@ -80,22 +84,67 @@ class NeuronNetwork(object):
 
         layers -- [target_idx, input_idx]
         scaling_factor -- scaling for input voltage
-        delay -- conduction delay, ms after a neuron fires from layer and is picked up in to layer
-        S -- synaptic connection strength matrix
+        delay -- conduction delay, ms after a neuron fires from layer and is picked up in to layer.
+                 Either a matrix or a single delay for all connections, defaults to 1ms
+        S -- synaptic connection strength matrix, defaults to all-to-all connections of strength 1.
+             May also be given as SparseSynapses, which carry their own delays.
         """
 
         if len(layers) != 2:
             raise StandardError("Expected layers to be an array of [target_index,input_index]")
 
-        target_idx, input_idx = layers
-        target_layer = self.layers[target_idx]
+        target_idx, target_layer = self._identify_layer(layers[0])
+        input_idx, input_layer = self._identify_layer(layers[1])
+        dim = (target_layer.N, input_layer.N)
+
+        if not isinstance(S, SparseSynapses):
+            S = SparseSynapses.from_dense(np.ones(dim) if S is None else S,
+                                          delay=1 if delay is None else delay)
+        elif delay is not None:
+            raise StandardError("Delays of SparseSynapses are taken from the synapses themselves")
+
+        if S.shape != dim:
+            raise StandardError("Expected connections of shape " + str(dim) + ", got " + str(S.shape))
 
         target_layer.S[input_idx] = S
         target_layer.factor[input_idx] = scaling_factor
-        target_layer.delay[input_idx] = delay
 
         return self
 
+    def _scatter_spikes(self, layer_index, fired_neurons, t):
+        """
+        Adds the input caused by neurons of the given layer firing at time t into the input buffers
+        of every layer that it projects to, in the slots for the time each spike will arrive.
+
+        Spikes with a delay longer than d_max, or shorter than _min_delay, are dropped.
+        """
+
+        if len(fired_neurons) == 0:
+            return
+
+        for target_index, target_layer in self.layers.items():
+            if layer_index not in target_layer.S:
+                continue
+
+            input_buffer = self.input_buffers[target_index]
+            min_delay = self._min_delay(target_index, layer_index)
+
+            targets, weights, delays = target_layer.S[layer_index].outgoing(fired_neurons)
+
+            deliverable = (delays >= min_delay) & (delays <= self.d_max)
+            slots = (t + delays[deliverable]) % len(input_buffer)
+
+            np.add.at(input_buffer, (slots, targets[deliverable]),
+                      target_layer.factor[layer_index] * weights[deliverable])
+
+    def _min_delay(self, target_index, input_index):
+        """
+        Shortest delay that can still be delivered from the input layer to the target layer. Layers
+        are ticked in index order, so only later layers can pick up a spike in the same ms.
+        """
+
+        return 0 if target_index > input_index else 1
+
     def _identify_layer(self, layer_item):
         """
         Receives either a layer index, or a layer and returns layer_index,layer
@@ -0,0 +1,190 @@
+import numpy as np
+from PackedNeuronNetwork import PackedNeuronNetwork
+from SparseSynapses import SparseSynapses
+from SpikeLog import SpikeLog
+
+
+class NeuronNetworkEnsemble(PackedNeuronNetwork):
+
+    """
+    Advances B independent neuron networks in lock-step, as one packed network with a batch axis.
+
+    Every network must have the same layer sizes and the same set of layer connections, but the
+    connections themselves, their scaling factors, the neuron parameters and the input currents may
+    all differ. State is held as (B, N) arrays, where row b is the packed state of network b, and the
+    connections of all networks are joined into one block-diagonal set of synapses per layer pair,
+    so the Python overhead of a tick does not grow with B.
+
+    I is the (B, N) input current, and like layer.I it accumulates synaptic input each tick until
+    reset. Firings are logged per layer for the whole ensemble, see member_firings.
+    """
+
+    def __init__(self, networks):
+        self.networks = list(networks)
+
+        template = self.networks[0]
+        layers = [template.layers[index] for index in xrange(len(template.layers))]
+
+        for net in self.networks:
+            if [net.layers[index].N for index in xrange(len(net.layers))] != [l.N for l in layers]:
+                raise StandardError("Networks of an ensemble must all have the same layer sizes")
+
+            if ([net.layers[index].substeps(net.dt) for index in xrange(len(net.layers))] !=
+                    [l.substeps(template.dt) for l in layers]):
+                raise StandardError("Networks of an ensemble must all take the same sub-steps in each layer")
+
+        super(NeuronNetworkEnsemble, self).__init__(layers, d_max=max(net.d_max for net in self.networks),
+                                                    dt=template.dt)
+
+    @property
+    def batch_size(self):
+        return len(self.networks)
+
+    def layer_slice(self, layer_index):
+        """
+        Columns of the (B, N) state that belong to the given layer
+        """
+
+        return slice(self.offsets[layer_index], self.offsets[layer_index + 1])
+
+    def pack(self):
+        """
+        Gathers the state, parameters and connections of every network into ensemble-wide arrays
+        """
+
+        sizes = [self.layers[index].N for index in xrange(len(self.layers))]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(int)
+
+        params = [[net.layers[index].packed_parameters() for index in xrange(len(self.layers))]
+                  for net in self.networks]
+
+        def gather(key):
+            return np.array([np.concatenate([np.broadcast_to(param[key], n)
+                                             for param, n in zip(net_params, sizes)])
+                             for net_params in params])
+
+        self.V = np.array([np.concatenate([net.layers[index].V for index in xrange(len(self.layers))])
+                           for net in self.networks], dtype=float)
+        self.U = gather('U').astype(float)
+        self.I = np.zeros(self.V.shape)
+
+        self.A, self.B, self.C, self.D = gather('A'), gather('B'), gather('C'), gather('D')
+        self.p2, self.p1, self.p0, self.q = gather('p2'), gather('p1'), gather('p0'), gather('q')
+        self.fire_threshold = gather('fire_threshold')
+        self.rk4 = gather('rk4').astype(bool)
+
+        for b, net in enumerate(self.networks):
+            for index in xrange(len(self.layers)):
+                net.layers[index].V = self.V[b, self.layer_slice(index)]
+                net.layers[index].U = self.U[b, self.layer_slice(index)]
+
+        self.input_buffers = dict((index, np.zeros((self.d_max + 1, self.batch_size * n)))
+                                  for index, n in enumerate(sizes))
+        self.spike_logs = dict((index, SpikeLog()) for index in xrange(len(self.layers)))
+        self.synapses = self._join_synapses()
+        self.schedule = self._schedule()
+
+        return self
+
+    def tick(self, t):
+        """
+        Advances the simulation by one step on all layers of every network at once
+        """
+
+        for layer_index, input_buffer in self.input_buffers.items():
+            slot = t % len(input_buffer)
+
+            self.I[:, self.layer_slice(layer_index)] += input_buffer[slot].reshape(self.batch_size, -1)
+            input_buffer[slot] = 0
+
+        members, fired_neurons = np.divmod(self._advance(), self.offsets[-1])
+        fired_layers = np.searchsorted(self.offsets[1:], fired_neurons, side='right')
+
+        for layer_index, layer in self.layers.items():
+            in_layer = fired_layers == layer_index
+
+            # Neurons are numbered across the ensemble as member * N + neuron_index, for each layer
+            fired_in_layer = members[in_layer] * layer.N + fired_neurons[in_layer] - self.offsets[layer_index]
+
+            self.spike_logs[layer_index].append(t, fired_in_layer)
+            self._scatter_spikes(layer_index, fired_in_layer, t)
+
+    def member_firings(self, member, layer_index):
+        """
+        Returns the [t, neuron_index] firings of the given layer in the given member network
+        """
+
+        N = self.layers[layer_index].N
+        firings = self.spike_logs[layer_index].firings
+        from_member = firings[:, 1] / N == member
+
+        return np.column_stack([firings[from_member, 0], firings[from_member, 1] - member * N])
+
+    def unpack_firings(self):
+        """
+        Copies the firings of each member into the layers of its own network, so that the networks
+        can be plotted and analysed individually
+        """
+
+        for b, net in enumerate(self.networks):
+            for layer_index in xrange(len(self.layers)):
+                net.layers[layer_index].firings = self.member_firings(b, layer_index)
+
+        return self.networks
+
+    def _flat_indexes(self, neurons):
+        """
+        Indexes into the flattened (B, N) state of the given packed neurons, in every member
+        """
+
+        return (np.arange(self.batch_size)[:, np.newaxis] * self.offsets[-1] + neurons).ravel()
+
+    def _join_synapses(self):
+        """
+        Joins the connections of every network into block-diagonal synapses over the neurons of the
+        whole ensemble, with the scaling factor of each network folded into the weights
+        """
+
+        synapses = {}
+
+        for target_index, target_layer in self.layers.items():
+            for input_index in target_layer.S:
+                dim = (self.batch_size * target_layer.N, self.batch_size * self.layers[input_index].N)
+                edges = []
+
+                for b, net in enumerate(self.networks):
+                    if input_index not in net.layers[target_index].S:
+                        raise StandardError("Networks of an ensemble must all have the same connections")
+
+                    targets, sources, weights, delays = net.layers[target_index].S[input_index].edges()
+                    factor = net.layers[target_index].factor[input_index]
+
+                    edges.append((targets + b * target_layer.N, sources + b * self.layers[input_index].N,
+                                  factor * weights, delays))
+
+                targets, sources, weights, delays = [np.concatenate(column) for column in zip(*edges)]
+                synapses[(target_index, input_index)] = SparseSynapses.from_edges(dim, targets, sources,
+                                                                                  weights, delays)
+
+        return synapses
+
+    def _scatter_spikes(self, layer_index, fired_neurons, t):
+        """
+        Adds the input caused by the ensemble-numbered neurons of the given layer firing at time t
+        into the input buffers of the layers it projects to
+        """
+
+        if len(fired_neurons) == 0:
+            return
+
+        for (target_index, input_index), synapses in self.synapses.items():
+            if input_index != layer_index:
+                continue
+
+            input_buffer = self.input_buffers[target_index]
+            targets, weights, delays = synapses.outgoing(fired_neurons)
+
+            deliverable = (delays >= self._min_delay(target_index, layer_index)) & (delays <= self.d_max)
+            slots = (t + delays[deliverable]) % len(input_buffer)
+
+            np.add.at(input_buffer, (slots, targets[deliverable]), weights[deliverable])
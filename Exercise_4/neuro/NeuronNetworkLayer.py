@@ -1,66 +1,126 @@
 import numpy as np
+from Integrators import INTEGRATORS
+from SpikeLog import SpikeLog
 
 
 class NeuronNetworkLayer(object):
 
     """
     General model of a neuron network layer. Can be used in a more general NeuronNetwork.
+
+    integrator -- name of the scheme V is integrated with, one of Integrators.INTEGRATORS
+    dt -- step size of the integrator in ms, defaults to the dt the layer is ticked with. Must
+          divide a ms into a whole number of sub-steps.
     """
 
-    def __init__(self, n):
+    def __init__(self, n, integrator='euler', dt=None):
+        if integrator not in INTEGRATORS:
+            raise StandardError("Unknown integrator " + str(integrator) + ", expected one of " +
+                                ", ".join(sorted(INTEGRATORS)))
+
         self.N = n
+        self.integrator = integrator
+        self.dt = dt
+
+        if dt is not None:
+            self.substeps(dt)
         self.I = np.zeros(n)
 
-        # S[n][i,j] is the strength of connection from neuron j in layer n to neuron i in this layer
+        # S[n] holds the SparseSynapses from the neurons in layer n to the neurons in this layer,
+        # with the strength and delay of every connection
         self.S = {}
-
-        # delay[n][i,j] is the delay between neuron j in layer n to neuron i in this layer
-        self.delay = {}
         self.factor = {}
 
-        self.firings = np.empty((0, 2))  # empty stack of tuples
+        self.spike_log = SpikeLog()
         self.V = -65 * np.ones(n)  # random starting voltages
 
     def tick(self, dt, t):
         """
         Simulates a single ms of time by interpolating the next values for membrane potentials of
-        each neuron in the layer.
+        each neuron in the layer. Returns the indexes of the neurons that fired during this ms, once
+        for every time they fired. dt is used unless the layer has a step size of its own.
         """
 
-        no_of_steps = int(1 / dt)
+        no_of_steps = self.substeps(dt)
+        dt = 1.0 / no_of_steps
+        fired_in_tick = []
 
         for step in xrange(no_of_steps):
             self._step_membrane_potential(dt, t)
 
-            fired_neurons = np.where(self.V >= self.fire_threshold)[0]
+            fired_neurons = self._fired_neurons()
             self._reset_neurons(fired_neurons)
 
-            for neuron_index in fired_neurons:
-                self._register_neuron_fire(neuron_index, t)
+            self._register_neuron_fire(fired_neurons, t)
+            fired_in_tick.append(fired_neurons)
+
+        return np.concatenate(fired_in_tick)
+
+    def substeps(self, dt):
+        """
+        Number of sub-steps the layer takes per ms when ticked with dt, at its own step size if it
+        has one
+        """
+
+        dt = dt if self.dt is None else self.dt
+        no_of_steps = int(round(1.0 / dt))
+
+        if no_of_steps < 1 or abs(no_of_steps * dt - 1) > 1e-9:
+            raise StandardError("Step size of " + str(dt) + "ms does not divide a ms into whole sub-steps")
+
+        return no_of_steps
+
+    @property
+    def firings(self):
+        """
+        Array of [t, neuron_index] rows recording every time a neuron in this layer fired
+        """
+
+        return self.spike_log.firings
+
+    @firings.setter
+    def firings(self, firings):
+        self.spike_log = SpikeLog(firings)
 
     def firings_after(self, cutoff):
         """
-        Returns the firing events that happened after the cutoff in steps
+        Returns the firing events that happened at or after the cutoff in steps
         """
 
-        index = len(self.firings) - 1
+        return self.spike_log.after(cutoff)
 
-        while index > 0:
-            firing_time, neuron_index = self.firings[index]
-            if firing_time < cutoff:
-                return
-            yield self.firings[index]
-            index = index - 1
+    def firings_between(self, start, end):
+        """
+        Returns the firing events that happened at or after start, and before end
+        """
+
+        return self.spike_log.between(start, end)
 
-    def _register_neuron_fire(self, neuron_index, t):
+    def _register_neuron_fire(self, neuron_indexes, t):
         """
-        Adds an entry to self.firings to record that the neuron has fired, at time t
+        Adds entries to the spike log to record that the neurons have fired, at time t
         """
 
-        if len(self.firings) > 0:
-            self.firings = np.vstack([self.firings, [t, neuron_index]])
-        else:
-            self.firings = np.array([[t, neuron_index]])
+        if len(neuron_indexes) > 0:
+            self.spike_log.append(t, neuron_indexes)
+
+    def packed_parameters(self):
+        """
+        Describes the layer's model for a PackedNeuronNetwork, which steps every neuron as
+        dv/dt = p2 * V^2 + p1 * V + p0 - U + q * I and du/dt = A * (B * V - U), resetting V to C and
+        adding D to U on fire. Returns a dict of U, A, B, C, D, p2, p1, p0, q, fire_threshold, and rk4
+        for whether V is integrated with Runge-Kutta rather than Euler. Scalars apply to all neurons.
+        """
+
+        raise NotImplementedError("Requires implementing in subclass")
+
+    def _fired_neurons(self):
+        """
+        Indexes of the neurons that fired in the last sub-step, by default those at or above the
+        fire threshold
+        """
+
+        return np.where(self.V >= self.fire_threshold)[0]
 
     def _reset_neurons(self, neuron_indexes):
         """
@@ -71,8 +131,31 @@ class NeuronNetworkLayer(object):
 
     def _step_membrane_potential(self, dt, t):
         """
-        Uses the Euler method to compute the next V (membrane potential).
-        The exact details of the equation will differ depending on the model.
+        Uses the layer's integrator to compute the next V (membrane potential), and then steps any
+        other state of the model. The exact details of the equations will differ depending on the model.
+        """
+
+        self.V = INTEGRATORS[self.integrator](self.V, self._dvdt, dt, self._dvdt_jacobian)
+        self._step_recovery(dt)
+
+    def _dvdt(self, V):
+        """
+        Method to override with dV/dt for the given V, holding the rest of the layer's state fixed
+        """
+
+        raise NotImplementedError("Requires implementing in subclass")
+
+    def _dvdt_jacobian(self, V):
+        """
+        Method to override with the derivative of dV/dt with respect to V, for the given V. Only
+        needed by the exponential Euler integrator.
         """
 
         raise NotImplementedError("Requires implementing in subclass")
+
+    def _step_recovery(self, dt):
+        """
+        Method to override for stepping state other than V forward by dt, after V has been stepped
+        """
+
+        pass
@@ -0,0 +1,183 @@
+import numpy as np
+from NeuronNetwork import NeuronNetwork
+
+
+class PackedNeuronNetwork(NeuronNetwork):
+
+    """
+    Neuron network that packs the state of every layer into one contiguous vector, so that the
+    whole network advances with a handful of NumPy calls per sub-step regardless of how many layers
+    it has. Layers describe their model through packed_parameters, and a per-neuron mask selects
+    Runge-Kutta or Euler integration for the neurons of each model type.
+
+    After packing, each layer's V and U are views into the network state. Parameters are copied, so
+    call pack() again after changing them.
+
+    Layers may take different numbers of sub-steps per ms, see NeuronNetworkLayer.substeps. Layers
+    with the same count are stepped together, so a network of fast and slow layers runs each group
+    only as many times as it needs.
+
+    Every neuron of a packed layer is integrated in full sub-steps, so layers in adaptive mode, see
+    IzhikevichLayer, are rejected. Use a plain NeuronNetwork for those.
+    """
+
+    def __init__(self, neuron_layers, d_max=25, dt=0.2):
+        super(PackedNeuronNetwork, self).__init__(neuron_layers, d_max=d_max, dt=dt)
+
+        self.pack()
+
+    def pack(self):
+        """
+        Gathers the state and parameters of every layer into network-wide arrays
+        """
+
+        for index in xrange(len(self.layers)):
+            if getattr(self.layers[index], 'adaptive', False):
+                raise StandardError("Layer " + str(index) + " is in adaptive mode, which a "
+                                    "PackedNeuronNetwork cannot integrate, use a NeuronNetwork instead")
+
+        sizes = [self.layers[index].N for index in xrange(len(self.layers))]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(int)
+
+        params = [self.layers[index].packed_parameters() for index in xrange(len(self.layers))]
+
+        def gather(key):
+            return np.concatenate([np.broadcast_to(param[key], n) for param, n in zip(params, sizes)])
+
+        self.V = np.concatenate([self.layers[index].V for index in xrange(len(self.layers))]).astype(float)
+        self.U = gather('U').astype(float)
+        self.I = np.zeros(len(self.V))
+
+        self.A, self.B, self.C, self.D = gather('A'), gather('B'), gather('C'), gather('D')
+        self.p2, self.p1, self.p0, self.q = gather('p2'), gather('p1'), gather('p0'), gather('q')
+        self.fire_threshold = gather('fire_threshold')
+        self.rk4 = gather('rk4').astype(bool)
+
+        for index in xrange(len(self.layers)):
+            start, end = self.offsets[index:index + 2]
+            self.layers[index].V = self.V[start:end]
+            self.layers[index].U = self.U[start:end]
+
+        self.schedule = self._schedule()
+
+        return self
+
+    def tick(self, t):
+        """
+        Advances the simulation by one step on all layers at once
+        """
+
+        for layer_index, layer in self.layers.items():
+            input_buffer = self.input_buffers[layer_index]
+            slot = t % len(input_buffer)
+
+            layer.I = layer.I + input_buffer[slot]
+            input_buffer[slot] = 0
+
+            self.I[self.offsets[layer_index]:self.offsets[layer_index + 1]] = layer.I
+
+        fired_neurons = self._advance()
+        fired_layers = np.searchsorted(self.offsets[1:], fired_neurons, side='right')
+
+        for layer_index, layer in self.layers.items():
+            fired_in_layer = fired_neurons[fired_layers == layer_index] - self.offsets[layer_index]
+
+            layer._register_neuron_fire(fired_in_layer, t)
+            self._scatter_spikes(layer_index, fired_in_layer, t)
+
+    def tick_layer(self, layer_index, t):
+        raise NotImplementedError("Layers of a PackedNeuronNetwork can only be ticked together")
+
+    def _schedule(self):
+        """
+        Groups the layers by the number of sub-steps they take per ms. Returns a list of
+        (no_of_steps, neurons) pairs, where neurons indexes the flattened state of the group, or is
+        None when the group is the whole network.
+        """
+
+        groups = {}
+        for index in xrange(len(self.layers)):
+            groups.setdefault(self.layers[index].substeps(self.dt), []).append(index)
+
+        if len(groups) == 1:
+            return [(no_of_steps, None) for no_of_steps in groups]
+
+        return [(no_of_steps, self._flat_indexes(np.concatenate([np.arange(self.offsets[index],
+                                                                           self.offsets[index + 1])
+                                                                 for index in groups[no_of_steps]])))
+                for no_of_steps in sorted(groups)]
+
+    def _flat_indexes(self, neurons):
+        """
+        Indexes into the flattened state of the given packed neurons
+        """
+
+        return neurons
+
+    def _advance(self):
+        """
+        Integrates every group of layers through its sub-steps for one ms, resetting the neurons that
+        fire. Returns the flattened indexes of the neurons that fired, once for every time they fired.
+        """
+
+        V, U, C, D = self.V.ravel(), self.U.ravel(), self.C.ravel(), self.D.ravel()
+        fire_threshold = self.fire_threshold.ravel()
+        fired_in_tick = []
+
+        for no_of_steps, neurons in self.schedule:
+            for step in xrange(no_of_steps):
+                self._step_membrane_potential(1.0 / no_of_steps, neurons)
+
+                if neurons is None:
+                    fired_neurons = np.where(V >= fire_threshold)[0]
+                else:
+                    fired_neurons = neurons[V[neurons] >= fire_threshold[neurons]]
+
+                V[fired_neurons] = C[fired_neurons]
+                U[fired_neurons] += D[fired_neurons]
+
+                fired_in_tick.append(fired_neurons)
+
+        return np.concatenate(fired_in_tick)
+
+    def _step_membrane_potential(self, dt, neurons=None):
+        """
+        Runge-Kutta or Euler step of V, by neuron, followed by an Euler step of U. Steps only the
+        neurons at the given indexes of the flattened state, or every neuron if None.
+        """
+
+        state = [self.V, self.U, self.I, self.A, self.B, self.p2, self.p1, self.p0, self.q, self.rk4]
+
+        if neurons is None:
+            self.V[...], self.U[...] = self._integrate(dt, *state)
+        else:
+            V, U = self._integrate(dt, *[X.ravel()[neurons] for X in state])
+            self.V.ravel()[neurons], self.U.ravel()[neurons] = V, U
+
+    def _integrate(self, dt, V, U, I, A, B, p2, p1, p0, q, rk4):
+        """
+        Returns V and U projected forward by dt
+        """
+
+        def dvdt(V):
+            return (p2 * V ** 2) + (p1 * V) + p0 - U + q * I
+
+        k1 = dvdt(V)
+
+        if np.any(rk4):
+            k2 = dvdt(V + 0.5 * dt * k1)
+            k3 = dvdt(V + 0.5 * dt * k2)
+            k4 = dvdt(V + dt * k3)
+
+            V = np.where(rk4, V + (dt / 6) * (k1 + 2 * k2 + 2 * k3 + k4), V + dt * k1)
+        else:
+            V = V + dt * k1
+
+        return V, U + dt * (A * (B * V - U))
+
+    def _min_delay(self, target_index, input_index):
+        """
+        All layers are ticked together, so no spike can arrive in the ms it was fired
+        """
+
+        return 1
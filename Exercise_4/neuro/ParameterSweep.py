@@ -0,0 +1,112 @@
+"""
+Examples
+========
+
+for summary in run_sweep(build_network, {'rewiring_p': [0, 0.1, 0.2]}, 1000, 'sweep'):
+    print(summary)  # => one summary per job, in the order the jobs finish
+"""
+
+import csv
+import itertools
+import multiprocessing
+import os
+
+import numpy as np
+from NetworkSimulator import simulate
+from Recorders import ArrayRecorder
+
+
+def expand_grid(grid):
+    """
+    Expands a dict of parameter names to lists of values into a list of parameter dicts, one for
+    every combination, in a deterministic order
+    """
+
+    names = sorted(grid.keys())
+
+    return [dict(zip(names, values)) for values in itertools.product(*[grid[name] for name in names])]
+
+
+def job_seed(seed, job_index):
+    """
+    Derives the random seed of a job from the seed of the sweep, so that every job is reproducible
+    regardless of which process runs it
+    """
+
+    return (seed * 1000003 + job_index) % (2 ** 32)
+
+
+def summarise(net, duration):
+    """
+    Summary metrics of a simulated network, the spike count and mean firing rate in Hz of each layer
+    """
+
+    summary = {}
+
+    for layer_index, layer in net.layers.items():
+        summary['spikes_' + str(layer_index)] = len(layer.firings)
+        summary['rate_' + str(layer_index)] = 1000.0 * len(layer.firings) / (layer.N * duration)
+
+    return summary
+
+
+def run_job(job):
+    """
+    Builds and simulates the network of a single job in a freshly seeded random state. Returns the
+    job's summary along with the firings of every layer.
+    """
+
+    job_index, params, seed, build, duration, simulate_kwargs = job
+
+    np.random.seed(seed)
+    VS, net = simulate(build(**params), duration, progress=False, recorder=ArrayRecorder(neurons={}),
+                       **simulate_kwargs)
+
+    summary = dict(params, job=job_index, seed=seed)
+    summary.update(summarise(net, duration))
+
+    return summary, dict(('firings_' + str(index), np.array(layer.firings))
+                         for index, layer in net.layers.items())
+
+
+def run_sweep(build, grid, duration, out_dir, processes=None, seed=0, **simulate_kwargs):
+    """
+    Simulates a network for every combination of parameters in the grid across a pool of processes,
+    yielding the summary of each job as it finishes.
+
+    build -- function taking the parameters of a job as keyword arguments and returning a network.
+             Must be defined at module level so that it can be sent to the worker processes.
+    grid -- dict of parameter names to lists of values
+    duration -- ms to simulate each network for
+    out_dir -- directory to stream results into, as job_<n>.npz spike logs and summary.csv
+    processes -- number of worker processes, defaults to the number of cores
+    seed -- seed of the sweep, from which every job's seed is derived
+    """
+
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+
+    jobs = [(job_index, params, job_seed(seed, job_index), build, duration, simulate_kwargs)
+            for job_index, params in enumerate(expand_grid(grid))]
+
+    pool = multiprocessing.Pool(processes)
+    summary_file = open(os.path.join(out_dir, 'summary.csv'), 'w')
+    writer = None
+
+    try:
+        for summary, firings in pool.imap_unordered(run_job, jobs):
+            np.savez_compressed(os.path.join(out_dir, 'job_' + str(summary['job']) + '.npz'), **firings)
+
+            if writer is None:
+                writer = csv.DictWriter(summary_file, fieldnames=sorted(summary.keys()))
+                writer.writeheader()
+
+            writer.writerow(summary)
+            summary_file.flush()
+
+            yield summary
+
+        pool.close()
+    finally:
+        pool.terminate()
+        summary_file.close()
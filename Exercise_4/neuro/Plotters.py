@@ -1,3 +1,4 @@
+from FiringRates import spike_histogram, window_counts
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -26,22 +27,13 @@ def plot_module_mean_firing_rate(layer, no_of_modules, resolution=None):
     window_buffer = window_size / 2
     max_spike_time = np.max(layer.firings[:, 0])
     duration = 100 * (1 + max_spike_time / 100)
-    firings = layer.firings
 
     sampling_ts = range(window_buffer, duration - window_buffer, n_steps)
-    firing_rates = np.zeros((len(sampling_ts), no_of_modules))
     module_size = layer.N / no_of_modules
 
-    for i, t in enumerate(sampling_ts):
-
-        firings_after_start = firings[firings[:, 0] > t - window_buffer]
-        firings_in_window = firings_after_start[firings_after_start[:, 0] < t + window_buffer]
-
-        for module_index, module_base in enumerate(range(0, layer.N, module_size)):
-            firings_from_module = np.where(np.logical_and(
-                firings_in_window >= module_base,
-                firings_in_window < module_base + module_size))[0]
-            firing_rates[i][module_index] = len(firings_from_module)
+    # Firings of each module over t - window_buffer < t' < t + window_buffer at every sampled t
+    histogram = spike_histogram(layer.firings, duration, module_size, no_of_modules)
+    firing_rates = window_counts(histogram, 2 * window_buffer - 1, np.array(sampling_ts, dtype=int) + window_buffer)
 
     plt.ylabel('Mean firing rate')
     plt.xlabel('Time (ms) + 0s')
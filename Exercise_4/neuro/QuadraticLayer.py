@@ -0,0 +1,39 @@
+from NeuronNetworkLayer import NeuronNetworkLayer
+import numpy as np
+import numpy.random as rn
+
+R = 1.0
+tau = 5
+vr = -65
+vc = -50
+
+
+class QuadraticLayer(NeuronNetworkLayer):
+
+    """
+    Implements a Integrate and Fire Quadratic neuron model.
+    """
+
+    def __init__(self, n, fire_threshold=30, integrator='euler', dt=None):
+        super(QuadraticLayer, self).__init__(n, integrator=integrator, dt=dt)
+
+        self.A = 0.19 + (0.02 * rn.rand(n))
+        self.fire_threshold = fire_threshold
+
+    def packed_parameters(self):
+        if self.integrator not in ('rk4', 'euler'):
+            raise StandardError("A PackedNeuronNetwork can only integrate with rk4 or euler")
+
+        # A * (vr - V) * (vc - V) expanded into powers of V, with no recovery variable
+        return {'U': np.zeros(self.N), 'A': 0, 'B': 0, 'C': vr, 'D': 0,
+                'p2': self.A / tau, 'p1': -self.A * (vr + vc) / tau, 'p0': self.A * vr * vc / tau,
+                'q': R / tau, 'fire_threshold': self.fire_threshold, 'rk4': self.integrator == 'rk4'}
+
+    def _reset_neurons(self, neuron_indexes):
+        self.V[neuron_indexes] = vr
+
+    def _dvdt(self, V):
+        return (self.A * (vr - V) * (vc - V) + R * self.I) / tau
+
+    def _dvdt_jacobian(self, V):
+        return self.A * (2 * V - vr - vc) / tau
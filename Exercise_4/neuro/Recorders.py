@@ -0,0 +1,166 @@
+"""
+Examples
+========
+
+simulate(net, 10000, recorder=ArrayRecorder())                        => every neuron, as before
+simulate(net, 10000, recorder=ArrayRecorder({0: range(10)}, every=5)) => 10 neurons of layer 0, every 5ms
+simulate(net, 10000, recorder=MemmapRecorder('run'))                  => streams to run_layer_<n>.npy
+"""
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+
+class Recorder(object):
+
+    """
+    Records the membrane potentials of a network as it is simulated, see NetworkSimulator.simulate.
+    Neurons that fired in a recorded ms are marked with a Dirac pulse.
+
+    neurons -- dict of layer index to the indexes of the neurons to record in that layer. Layers
+               missing from the dict are not recorded. Defaults to every neuron of every layer.
+    every -- record one sample every n ms, starting at t=0
+    dtype -- type to store the samples as
+    """
+
+    def __init__(self, neurons=None, every=1, dtype=np.float32, dirac_pulse=30):
+        self.requested_neurons = neurons
+        self.every = every
+        self.dtype = dtype
+        self.dirac_pulse = dirac_pulse
+
+    def start(self, net, duration):
+        """
+        Prepares to record the given network for a simulation of the given duration
+        """
+
+        if self.requested_neurons is None:
+            self.neurons = dict((index, np.arange(layer.N)) for index, layer in net.layers.items())
+        else:
+            self.neurons = dict((index, np.asarray(neurons, dtype=int))
+                                for index, neurons in self.requested_neurons.items())
+
+        # _positions[n][j] is where neuron j of layer n is in a sample, or -1 if it isn't recorded
+        self._positions = {}
+        for index, neurons in self.neurons.items():
+            self._positions[index] = -1 * np.ones(net.layers[index].N, dtype=int)
+            self._positions[index][neurons] = np.arange(len(neurons))
+
+        self.no_of_layers = len(net.layers)
+        self.no_of_samples = (duration + self.every - 1) / self.every
+        self._open()
+
+    def record(self, t, net):
+        """
+        Records the membrane potentials of the network at time t, if t is a sampled time
+        """
+
+        if t % self.every != 0:
+            return
+
+        for index, neurons in self.neurons.items():
+            layer = net.layers[index]
+            sample = layer.V[neurons].astype(self.dtype)
+
+            fired = self._positions[index][layer.firings_between(t, t + 1)[:, 1]]
+            sample[fired[fired >= 0]] = self.dirac_pulse
+
+            self._write(index, t / self.every, sample)
+
+    def finish(self):
+        """
+        Completes the recording, returning whatever the recorder has collected
+        """
+
+        return self._close()
+
+    def _open(self):
+        raise NotImplementedError("Requires implementing in subclass")
+
+    def _write(self, layer_index, row, sample):
+        raise NotImplementedError("Requires implementing in subclass")
+
+    def _close(self):
+        raise NotImplementedError("Requires implementing in subclass")
+
+
+class ArrayRecorder(Recorder):
+
+    """
+    Records into in-memory arrays, returning VS[layer_index] of shape [samples, neurons], with None
+    for layers that are not recorded.
+    """
+
+    def _open(self):
+        self.VS = dict((index, np.zeros([self.no_of_samples, len(neurons)], dtype=self.dtype))
+                       for index, neurons in self.neurons.items())
+
+    def _write(self, layer_index, row, sample):
+        self.VS[layer_index][row] = sample
+
+    def _close(self):
+        return [self.VS.get(index) for index in range(self.no_of_layers)]
+
+
+class MemmapRecorder(ArrayRecorder):
+
+    """
+    Records into memory-mapped .npy files named <path>_layer_<n>.npy, so that the recording lives on
+    disk rather than in memory. Returns the memory maps, which can later be reopened with np.load.
+    """
+
+    def __init__(self, path, neurons=None, every=1, dtype=np.float32, dirac_pulse=30):
+        super(MemmapRecorder, self).__init__(neurons, every=every, dtype=dtype, dirac_pulse=dirac_pulse)
+
+        self.path = path
+
+    def _open(self):
+        self.VS = dict((index, open_memmap(self.path + '_layer_' + str(index) + '.npy', mode='w+',
+                                           dtype=self.dtype, shape=(self.no_of_samples, len(neurons))))
+                       for index, neurons in self.neurons.items())
+
+    def _close(self):
+        for V in self.VS.values():
+            V.flush()
+
+        return super(MemmapRecorder, self)._close()
+
+
+class CallbackRecorder(Recorder):
+
+    """
+    Collects samples into chunks of chunk_size rows, handing each chunk over as it fills by calling
+    callback(layer_index, first_row, chunk). Only one chunk per layer is held in memory.
+    """
+
+    def __init__(self, callback, chunk_size=1000, neurons=None, every=1, dtype=np.float32, dirac_pulse=30):
+        super(CallbackRecorder, self).__init__(neurons, every=every, dtype=dtype, dirac_pulse=dirac_pulse)
+
+        self.callback = callback
+        self.chunk_size = chunk_size
+
+    def _open(self):
+        self.chunks = dict((index, np.zeros([self.chunk_size, len(neurons)], dtype=self.dtype))
+                           for index, neurons in self.neurons.items())
+        self.first_rows = dict((index, 0) for index in self.neurons)
+        self.end_rows = dict((index, 0) for index in self.neurons)
+
+    def _write(self, layer_index, row, sample):
+        first_row = self.first_rows[layer_index]
+        self.chunks[layer_index][row - first_row] = sample
+        self.end_rows[layer_index] = row + 1
+
+        if row - first_row + 1 == self.chunk_size:
+            self._flush(layer_index, row + 1)
+
+    def _close(self):
+        for index in self.chunks:
+            self._flush(index, self.end_rows[index])
+
+    def _flush(self, layer_index, end_row):
+        first_row = self.first_rows[layer_index]
+
+        if end_row > first_row:
+            self.callback(layer_index, first_row, self.chunks[layer_index][:end_row - first_row].copy())
+
+        self.first_rows[layer_index] = end_row
@@ -0,0 +1,98 @@
+import numpy as np
+
+
+class SparseSynapses(object):
+
+    """
+    Synaptic connections from an input layer to a target layer, compressed by input neuron.
+
+    The outgoing synapses of input neuron j are stored at [indptr[j], indptr[j + 1]) of the
+    targets, weights and delays arrays, so only connections that exist take up memory and spike
+    delivery only visits the real synapses of the neurons that fired.
+    """
+
+    @classmethod
+    def from_dense(cls, S, delay=1):
+        """
+        Compresses a dense strength matrix, where S[i,j] is the strength of connection from neuron j
+        in the input layer to neuron i in the target layer. Zero entries are treated as absent.
+
+        delay -- either a matrix of the same shape as S, or a single delay for all connections
+        """
+
+        S = np.asarray(S)
+        targets, sources = np.nonzero(S)
+        delays = np.broadcast_to(np.asarray(delay, dtype=int), S.shape)[targets, sources]
+
+        return cls.from_edges(S.shape, targets, sources, S[targets, sources], delays)
+
+    @classmethod
+    def from_edges(cls, dim, targets, sources, weights=1, delays=1):
+        """
+        Builds the connections from an edge list, where edge k connects input neuron sources[k] to
+        target neuron targets[k].
+
+        dim -- dimensions of the connections, [nodes_in_target_layer, nodes_in_input_layer]
+        weights -- strength of each edge, or a single strength for all of them
+        delays -- conduction delay of each edge in ms, or a single delay for all of them
+        """
+
+        targets = np.asarray(targets, dtype=int).ravel()
+        sources = np.asarray(sources, dtype=int).ravel()
+        weights = np.broadcast_to(weights, targets.shape)
+        delays = np.broadcast_to(delays, targets.shape)
+
+        order = np.argsort(sources, kind='mergesort')
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(sources, minlength=dim[1]))])
+
+        return cls(dim, indptr, targets[order], weights[order], delays[order])
+
+    def __init__(self, dim, indptr, targets, weights, delays):
+        self.shape = tuple(dim)
+
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=float)
+        self.delays = np.asarray(delays, dtype=np.int32)
+
+    @property
+    def nnz(self):
+        return len(self.targets)
+
+    def outgoing(self, neuron_indexes):
+        """
+        Returns the targets, weights and delays of every synapse leaving the given input neurons,
+        concatenated in the order the neurons were given.
+        """
+
+        neuron_indexes = np.asarray(neuron_indexes, dtype=int)
+
+        starts = self.indptr[neuron_indexes]
+        counts = self.indptr[neuron_indexes + 1] - starts
+
+        # Position of each synapse in the compressed arrays, run by run
+        index = np.repeat(starts + counts - np.cumsum(counts), counts) + np.arange(np.sum(counts))
+
+        return self.targets[index], self.weights[index], self.delays[index]
+
+    def edges(self):
+        """
+        Returns the connections as an edge list of targets, sources, weights and delays, as taken by
+        from_edges
+        """
+
+        sources = np.repeat(np.arange(self.shape[1]), np.diff(self.indptr))
+
+        return self.targets, sources, self.weights, self.delays
+
+    def to_dense(self):
+        """
+        Expands the connections into a dense strength matrix, S[i,j] as in from_dense
+        """
+
+        targets, sources, weights, _ = self.edges()
+
+        S = np.zeros(self.shape)
+        np.add.at(S, (targets, sources), weights)
+
+        return S
@@ -0,0 +1,158 @@
+import numpy as np
+
+
+class SpikeLog(object):
+
+    """
+    Growable record of firing events, stored as compact int32 rows of [t, neuron_index].
+
+    The underlying array doubles in capacity whenever it fills, so appending a batch of firings is
+    amortised O(1) per spike rather than copying the whole record each time.
+
+    Firings must be recorded in time order. Alongside them is an index from each ms to the offset of
+    its first firing in the log, so all of the firings within a window of time are found in O(1) as
+    one contiguous slice.
+    """
+
+    def __init__(self, firings=None, capacity=1024):
+        self._data = np.empty((max(capacity, 1), 2), dtype=np.int32)
+        self._count = 0
+
+        # _offsets[k] is the number of firings before time _origin + k, for k in [0, _span]
+        self._origin = 0
+        self._offsets = np.zeros(max(capacity, 1), dtype=np.int64)
+        self._span = 0
+
+        if firings is not None:
+            self.extend(firings)
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def firings(self):
+        """
+        Array of [t, neuron_index] rows for every recorded firing, in the order they were recorded
+        """
+
+        return self._data[:self._count]
+
+    @property
+    def times(self):
+        return self._data[:self._count, 0]
+
+    @property
+    def neurons(self):
+        return self._data[:self._count, 1]
+
+    def between(self, start, end):
+        """
+        Returns the firings with start <= t < end, as a slice of the log
+        """
+
+        start, end = self._offset(start), self._offset(end)
+
+        return self._data[start:max(start, end)]
+
+    def after(self, cutoff):
+        """
+        Returns the firings with t >= cutoff, as a slice of the log
+        """
+
+        return self._data[self._offset(cutoff):self._count]
+
+    def append(self, t, neuron_indexes):
+        """
+        Records that all of the given neurons fired at time t
+        """
+
+        neuron_indexes = np.ravel(neuron_indexes)
+        size = len(neuron_indexes)
+
+        if size == 0:
+            return
+
+        self._index_time(t)
+        self._reserve(self._count + size)
+
+        rows = self._data[self._count:self._count + size]
+        rows[:, 0] = t
+        rows[:, 1] = neuron_indexes
+
+        self._count += size
+        self._offsets[self._span] = self._count
+
+    def extend(self, firings):
+        """
+        Appends an array of [t, neuron_index] rows, sorted by t, to the log
+        """
+
+        firings = np.reshape(firings, (-1, 2)).astype(np.int32)
+
+        if len(firings) == 0:
+            return
+
+        if np.any(np.diff(firings[:, 0]) < 0):
+            raise ValueError("Firings must be recorded in time order")
+
+        boundaries = np.concatenate([[0], np.where(np.diff(firings[:, 0]) != 0)[0] + 1])
+
+        for start, end in zip(boundaries, np.append(boundaries[1:], len(firings))):
+            self.append(firings[start, 0], firings[start:end, 1])
+
+    def clear(self):
+        self._count = 0
+        self._span = 0
+
+    def _offset(self, t):
+        """
+        Number of firings recorded before time t
+        """
+
+        k = int(np.ceil(t)) - self._origin
+
+        if k <= 0:
+            return 0
+        if k >= self._span:
+            return self._count
+
+        return self._offsets[k]
+
+    def _index_time(self, t):
+        """
+        Extends the time index to cover firings at time t, which must not be before the last one
+        """
+
+        if self._count == 0:
+            self._origin, self._span = int(t), 0
+            self._offsets[0] = 0
+
+        k = int(t) - self._origin
+
+        if k < self._span - 1:
+            raise ValueError("Firings must be recorded in time order")
+
+        if k + 1 >= len(self._offsets):
+            offsets = np.empty(2 * (k + 1), dtype=np.int64)
+            offsets[:self._span + 1] = self._offsets[:self._span + 1]
+            self._offsets = offsets
+
+        # No firings happened in the ms between the last recorded firing and t
+        self._offsets[self._span + 1:k + 2] = self._count
+        self._span = max(self._span, k + 1)
+
+    def _reserve(self, size):
+        """
+        Ensures the underlying array can hold at least size rows, growing it geometrically
+        """
+
+        capacity = len(self._data)
+        if size <= capacity:
+            return
+
+        while capacity < size:
+            capacity = 2 * capacity
+
+        data = np.empty((capacity, 2), dtype=np.int32)
+        data[:self._count] = self._data[:self._count]
+        self._data = data
@@ -0,0 +1,178 @@
+"""
+Computational Neurodynamics
+Exercise 5
+
+(C) Murray Shanahan et al, 2015
+"""
+
+from PhaseSynchrony import HilbertPhases, KuramotoOrderParameter, PairwiseSynchrony
+import numpy as np
+
+
+class OnlineSynchrony(object):
+  """
+  Estimates the synchronisation of populations live, from their mean firing
+  rates as a simulation produces them, in memory bounded by a window of
+  recent samples rather than the length of the run.
+
+  Every hop samples, the phases of the last window samples are computed with
+  one batched Hilbert transform, after centring each population's samples on
+  their mean over the window. The phases of the samples up to lag before the
+  newest are then reported. A Hilbert transform is least accurate near the
+  ends of its series, so a longer lag is closer to the phases of the whole
+  run, at the cost of reporting them lag ms late.
+
+  Nothing is reported until the first window samples have arrived. At that
+  point the phases of every sample from time 0 are reported at once, from
+  that first window. The last lag samples, and any samples short of a hop,
+  are only reported by finish, from the window that ends with them. After
+  finish, every sample from time 0 has been reported exactly once, and the
+  running means cover every sample after the discarded transient.
+
+  Usage, where MF is the latest sample of every population:
+
+    sync = OnlineSynchrony(populations)
+    for t in xrange(T):
+      ...
+      times, order = sync.update(MF)
+    times, order = sync.finish()
+    print sync.mean_synchrony
+  """
+
+  def __init__(self, populations, window=256, lag=64, hop=16, discard=100):
+    """
+    Inputs:
+    populations -- Number of populations
+    window      -- Number of recent samples the phases are computed from
+    lag         -- Number of samples the phases are reported behind the newest
+    hop         -- Number of samples between phase computations, which must
+                   divide window
+    discard     -- Length of the initial transient period, left out of the
+                   running means
+    """
+
+    if hop < 1 or lag < 0 or lag + hop > window or window % hop != 0:
+      raise ValueError("Expected 1 <= hop and 0 <= lag with lag + hop <= window, and hop dividing window")
+
+    self.window = window
+    self.lag = lag
+    self.hop = hop
+    self.discard = discard
+
+    self.buffer = np.zeros([populations, window])
+    self.pending = np.zeros([populations, 0])
+
+    # Number of samples consumed, of those in the buffer, and the time of
+    # the first sample not yet reported
+    self.t = 0
+    self.filled = 0
+    self.reported = 0
+    self.finished = False
+
+    self.count = 0
+    self.order_sum = 0.0
+    self.pairwise_sum = np.zeros([populations, populations])
+
+  @property
+  def mean_synchrony(self):
+    """
+    Mean over time of the Kuramoto order parameter of the populations, which
+    is the mean synchronisation index of SynchronisationIndex for two
+    """
+
+    return self.order_sum / max(self.count, 1)
+
+  @property
+  def pairwise_synchrony(self):
+    """
+    Mean over time of the synchronisation index of every pair of populations
+    """
+
+    return self.pairwise_sum / max(self.count, 1)
+
+  def update(self, MF):
+    """
+    Consumes the next samples of the mean firing rates, a [populations]
+    array for one ms or a [populations, T] array for several.
+
+    Returns the times of the phases that became available, and the Kuramoto
+    order parameter of the populations at those times.
+    """
+
+    if self.finished:
+      raise ValueError("Cannot update an OnlineSynchrony after finish")
+
+    MF = np.asarray(MF, dtype=float)
+    if MF.ndim == 1:
+      MF = MF[:, np.newaxis]
+
+    self.pending = np.hstack([self.pending, MF])
+
+    times = []
+    order = []
+
+    while self.pending.shape[1] >= self.hop:
+      block = self.pending[:, :self.hop]
+      self.pending = self.pending[:, self.hop:]
+
+      self.buffer = np.hstack([self.buffer[:, self.hop:], block])
+      self.t += self.hop
+      self.filled = min(self.filled + self.hop, self.window)
+
+      if self.filled == self.window:
+        block_times, block_order = self._report(self.buffer, self.t - self.window, self.t - self.lag)
+
+        times.append(block_times)
+        order.append(block_order)
+
+    return self._joined(times, order)
+
+  def finish(self):
+    """
+    Reports the phases of every sample not yet reported, from the window
+    that ends with the last sample, including streams shorter than a window.
+    Returns their times and Kuramoto order parameters, as update.
+    """
+
+    if self.finished:
+      return self._joined([], [])
+
+    self.finished = True
+
+    samples = np.hstack([self.buffer[:, self.window - self.filled:], self.pending])
+    end = self.t + self.pending.shape[1]
+
+    if samples.shape[1] == 0:
+      return self._joined([], [])
+
+    times, order = self._report(samples, self.t - self.filled, end)
+    return self._joined([times], [order])
+
+  def _report(self, samples, first, end):
+    """
+    Computes the phases of the given samples, the first of which is at time
+    first, and reports those from the first unreported time up to end,
+    adding them to the running means
+    """
+
+    phases = HilbertPhases(samples, discard=0)[:, self.reported - first:end - first]
+
+    block_times = np.arange(self.reported, end)
+    block_order = KuramotoOrderParameter(phases)
+
+    self.reported = end
+
+    settled = block_times >= self.discard
+    if np.any(settled):
+      self.count += np.sum(settled)
+      self.order_sum += np.sum(block_order[settled])
+      self.pairwise_sum += PairwiseSynchrony(phases[:, settled]) * np.sum(settled)
+
+    return block_times, block_order
+
+  @staticmethod
+  def _joined(times, order):
+    if not times:
+      return np.zeros(0, dtype=int), np.zeros(0)
+
+    return np.concatenate(times), np.concatenate(order)
@@ -0,0 +1,75 @@
+"""
+Computational Neurodynamics
+Exercise 5
+
+(C) Murray Shanahan et al, 2015
+"""
+
+from scipy.signal import hilbert
+import numpy as np
+
+
+def HilbertPhases(MF, discard=100):
+  """
+  Computes the instantaneous phase of the mean firing rate of every
+  population, with one batched FFT over all of them.
+
+  Inputs:
+  MF      -- [populations, T] array of mean firing rates, or a single series
+  discard -- Length of the initial transient period to drop
+
+  Returns a [populations, T - discard] array of phases in radians.
+  """
+
+  MF = np.atleast_2d(MF)
+
+  # Centre time series on zero
+  MF = MF - np.mean(MF, axis=1)[:, np.newaxis]
+
+  # Discard initial transient period
+  MF = MF[:, discard:]
+
+  return np.angle(hilbert(MF, axis=1))
+
+
+def PairwiseSynchrony(phases):
+  """
+  Computes the synchronisation index of every pair of populations, the time
+  average of |exp(i * phase_a) + exp(i * phase_b)| / 2, as in
+  SynchronisationIndex.
+
+  Inputs:
+  phases -- [populations, T] array of phases, from HilbertPhases
+
+  Returns a symmetric [populations, populations] array, with ones on the
+  diagonal.
+  """
+
+  P = len(phases)
+  cos, sin = np.cos(phases), np.sin(phases)
+
+  sync = np.zeros([P, P])
+
+  # One row at a time keeps memory at [populations, T]
+  for a in xrange(P):
+    # |exp(i * x) + exp(i * y)| / 2 = sqrt((1 + cos(x - y)) / 2)
+    cos_difference = cos[a] * cos[a:] + sin[a] * sin[a:]
+    sync[a, a:] = np.mean(np.sqrt(np.maximum(1 + cos_difference, 0) / 2.0), axis=1)
+
+  return np.triu(sync) + np.triu(sync, 1).T
+
+
+def KuramotoOrderParameter(phases):
+  """
+  Computes the Kuramoto order parameter of the populations over time,
+  |mean of exp(i * phase)| across populations, which is 1 when they are all
+  in phase. The global synchrony of the populations is its mean over time.
+  For two populations it is the synchronisation index of SynchronisationIndex.
+
+  Inputs:
+  phases -- [populations, T] array of phases, from HilbertPhases
+
+  Returns an array of the order parameter at each of the T times.
+  """
+
+  return np.hypot(np.mean(np.cos(phases), axis=0), np.mean(np.sin(phases), axis=0))
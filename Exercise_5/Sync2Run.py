@@ -7,7 +7,9 @@ Exercise 5
 
 import sys
 sys.path.append('../Exercise_2')
+sys.path.append('../Exercise_4')
 
+from neuro.FiringRates import mean_firing_rates
 from Sync2Connect import Sync2Connect
 import numpy as np
 import numpy.random as rn
@@ -61,12 +63,13 @@ def Sync2Run():
   # Moving averages of firing rates in Hz for excitatory population
   ws = 10  # window size
   ds = 1   # slide window by ds
-  MF0 = np.zeros(np.ceil(T*1.0/ds))
-  MF2 = np.zeros(np.ceil(T*1.0/ds))
+  MF0 = np.zeros(int(np.ceil(T*1.0/ds)))
+  MF2 = np.zeros(int(np.ceil(T*1.0/ds)))
 
-  for j in xrange(1, T, ds):
-    MF0[j/ds] = sum(1*(firings0[:, 0] >= (j-ws)) * (firings0[:, 0] < j)) * 1000.0/(ws*N1)
-    MF2[j/ds] = sum(1*(firings2[:, 0] >= (j-ws)) * (firings2[:, 0] < j)) * 1000.0/(ws*N1)
+  # Rate over the ws ms before each j = ds, 2*ds, ...
+  ends = np.arange(1, T, ds)
+  MF0[ends/ds] = mean_firing_rates(firings0, ws, ends, group_size=N1, no_of_groups=1)[:, 0]
+  MF2[ends/ds] = mean_firing_rates(firings2, ws, ends, group_size=N1, no_of_groups=1)[:, 0]
 
   # Raster plots of firings
   plt.subplot(211)
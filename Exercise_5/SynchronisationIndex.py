@@ -5,7 +5,7 @@ Exercise 5
 (C) Murray Shanahan et al, 2015
 """
 
-from scipy.signal import hilbert
+from PhaseSynchrony import HilbertPhases, KuramotoOrderParameter
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -14,25 +14,22 @@ def SynchronisationIndex(MF1, MF2, N, T):
   """
   Computes the synchronisation index between two populations given firing data
   MF1 and MF2, where N is the total number of neurons in each population and T
-  is the length of the run that produced the data
+  is the length of the run that produced the data. Plots the analysis, see
+  PhaseSynchrony for computing it alone and for many populations at once.
 
   """
 
-  # Centre time series on zero
-  MF1 = MF1 - np.mean(MF1)
-  MF2 = MF2 - np.mean(MF2)
-
   # Discard initial transient period
   discard = 100
-  MF1 = MF1[discard:]
-  MF2 = MF2[discard:]
 
-  # Calculate phase using Hilbert transform
-  phase1 = np.angle(hilbert(MF1))
-  phase2 = np.angle(hilbert(MF2))
+  # Calculate phase using Hilbert transform, of the time series centred on zero
+  phase1, phase2 = HilbertPhases(np.vstack([MF1, MF2]), discard)
+
+  MF1 = (MF1 - np.mean(MF1))[discard:]
+  MF2 = (MF2 - np.mean(MF2))[discard:]
 
   # Calculate synchronisation index
-  phi = np.abs((np.exp(1j*phase1) + np.exp(1j*phase2)) / 2.0)
+  phi = KuramotoOrderParameter(np.vstack([phase1, phase2]))
 
   print "Mean synchronisation: ", np.mean(phi)
 
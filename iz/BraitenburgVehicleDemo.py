@@ -1,12 +1,16 @@
 #!/usr/bin/env python
 
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Exercise_4'))
+
 import numpy as np
 import numpy.random as rn
 import matplotlib.pyplot as plt
 
 from Environment import Environment
-from NeuronNetwork import NeuronNetwork
-from IzhikevichLayer import IzhikevichLayer
+from neuro.PackedNeuronNetwork import PackedNeuronNetwork
+from neuro.IzhikevichLayer import IzhikevichLayer
 
 motor_max = 40
 wheel_velocity_min = 0.025
@@ -69,7 +73,7 @@ class Vehicle(object):
     def _construct_network(self, layer_dimensions):
         """
         Creates a network of four Izhikevich layers, to represent the four layers that control a
-        Braitenburg vehicle.
+        Braitenburg vehicle. The layers are tiny, so they are packed to be stepped together.
 
         Layers 0 and 1 represent the sensory input layers, while 2 and 3 are output layers connected
         to motors.
@@ -78,9 +82,9 @@ class Vehicle(object):
         scaling_factor = 50 / np.sqrt(layer_dimensions[0])
 
         # Initialize [LeftSensory, RightSensory, LeftMotor, RightMotor]
-        net = NeuronNetwork([hetrogenize_layer(IzhikevichLayer(layer_dimensions[i]))
-                            for i in [0, 0, 1, 1]],
-                            d_max=max_conduction_delay)
+        net = PackedNeuronNetwork([hetrogenize_layer(IzhikevichLayer(layer_dimensions[i]))
+                                   for i in [0, 0, 1, 1]],
+                                  d_max=max_conduction_delay)
 
         # Connect sensory networks to alternate motor networks, in order to have attractive movement
         for sensory, motor in [[0, 3], [1, 2]]:
@@ -134,12 +138,8 @@ for t in xrange(len(T)):
 
     sl, sr = env.read_sensors(x[t], y[t], w[t])
 
-    # Reset the neuron firings tab, but carry over those firings that may not have yet reached their
-    # target. Pull the time back to mark these firings as now negative.
-    for layer_index, layer in vehicle.net.layers.items():
-        firings = [[f[0] - dt, f[1]] for f in layer.firings if f[0] > dt - max_conduction_delay]
-        layer.firings = np.array(firings)
-
+    # Firings that have not yet reached their target are held in the network's input buffers, so
+    # the simulation time just carries on across robot steps
     for t2 in xrange(dt):
         vehicle.net.layers[0].I = rn.poisson(sl * 15, vehicle.net.layers[0].N)
         vehicle.net.layers[1].I = rn.poisson(sr * 15, vehicle.net.layers[1].N)
@@ -147,16 +147,15 @@ for t in xrange(len(T)):
         vehicle.net.layers[2].I = 5 * rn.randn(vehicle.net.layers[2].N)
         vehicle.net.layers[3].I = 5 * rn.randn(vehicle.net.layers[3].N)
 
-        vehicle.net.tick(t2)
+        vehicle.net.tick(t * dt + t2)
 
         for layer_index, layer in vehicle.net.layers.items():
             membrane_potentials[layer_index][t2, :] = layer.V
 
-    for layer_index, layer in vehicle.net.layers.items():
-        layer.firings = np.array(filter(lambda f: f[0] > 0, layer.firings))
+    motor_firings = [vehicle.net.layers[i].firings_between(t * dt, (t + 1) * dt) for i in [2, 3]]
 
-    rl = 1.0 * len(vehicle.net.layers[2].firings) / dt / vehicle.net.layers[2].N * 1000
-    rr = 1.0 * len(vehicle.net.layers[3].firings) / dt / vehicle.net.layers[3].N * 1000
+    rl = 1.0 * len(motor_firings[0]) / dt / vehicle.net.layers[2].N * 1000
+    rr = 1.0 * len(motor_firings[1]) / dt / vehicle.net.layers[3].N * 1000
 
     ul = (wheel_velocity_min / wheel_velocity_max + rl / motor_max * (1 - wheel_velocity_min / wheel_velocity_max))
     ur = (wheel_velocity_min / wheel_velocity_max + rr / motor_max * (1 - wheel_velocity_min / wheel_velocity_max))
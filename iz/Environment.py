@@ -3,19 +3,28 @@ import numpy.random as rn
 
 
 def _within_left_sensor(dw, start=0.125 * np.pi, end=0.5 * np.pi):
-    return ((start <= dw < end) or (-2 * np.pi + start <= dw < -2 * np.pi + end))
+    return ((start <= dw) & (dw < end)) | ((-2 * np.pi + start <= dw) & (dw < -2 * np.pi + end))
 
 
 def _within_right_sensor(dw, start=1.5 * np.pi, end=1.875 * np.pi):
-    return ((start < dw <= end) or (-2 * np.pi + start < dw <= -2 * np.pi + end))
+    return ((start < dw) & (dw <= end)) | ((-2 * np.pi + start < dw) & (dw <= -2 * np.pi + end))
 
 
-class Environment:
+class Environment(object):
     """
     Environment for the robot to run around. Holds a list of objects
     the robot should either avoid or catch.
+
+    The objects are stored as arrays of their x and y co-ords and sizes, so that sensor readings are
+    computed for every object, and for many robots, in one pass.
+
+    Sensors only respond to objects within sensor_range, so the objects are also indexed by a grid
+    over the torus whose cells are at least sensor_range wide. A sensor read only inspects the objects
+    in the robot's cell and the eight cells around it. The grid is rebuilt by set_objects.
     """
 
+    sensor_range = 25.0
+
     def __init__(self, no_of_objects, min_size, max_size, x_max, y_max):
         self.x_max = x_max
         self.y_max = y_max
@@ -23,60 +32,128 @@ class Environment:
         self.min_size = min_size
         self.max_size = max_size
 
-        self.objects = [self._new_object() for _ in range(no_of_objects)]
+        # Cells divide each side of the torus evenly, and a single cell covers a side too short for more
+        self.cells_x = max(1, int(x_max // self.sensor_range))
+        self.cells_y = max(1, int(y_max // self.sensor_range))
+
+        # Each object draws its x, y and size in turn
+        draws = rn.rand(no_of_objects, 3)
+
+        self.set_objects(draws[:, 0] * x_max, draws[:, 1] * y_max, min_size + draws[:, 2] * (max_size - min_size))
+
+    @property
+    def objects(self):
+        """
+        List of the objects, as dicts of their x, y and size r
+        """
+
+        return [{'x': x, 'y': y, 'r': r} for x, y, r in zip(self.object_x, self.object_y, self.object_r)]
+
+    def set_objects(self, x, y, r):
+        """
+        Replaces the objects with ones at the given arrays of co-ords and sizes, and rebuilds the grid
+        """
+
+        self.object_x = np.asarray(x, dtype=float)
+        self.object_y = np.asarray(y, dtype=float)
+        self.object_r = np.asarray(r, dtype=float)
+
+        # Objects are sorted by cell, so that the objects of cell c are
+        # _grid_objects[_grid_offsets[c]:_grid_offsets[c + 1]]
+        cells = self._cell_of(self.object_x, self.object_y)
+
+        self._grid_objects = np.argsort(cells, kind='mergesort')
+        self._grid_offsets = np.searchsorted(cells[self._grid_objects], np.arange(self.cells_x * self.cells_y + 1))
 
     def read_sensors(self, x, y, w):
         """
         Computes sensor readings for a robot positoned at (x,y) with orientation of w inside the
-        environment.
+        environment. x, y and w can also be arrays for many robots, giving arrays of readings.
         """
 
-        sensor_left = 0
-        sensor_right = 0
+        shape = np.broadcast(x, y, w).shape
+        x, y, w = [np.ravel(np.broadcast_to(np.asarray(value, dtype=float), shape)) for value in (x, y, w)]
+
+        robots, objects = self._nearby_objects(x, y)
+
+        # Readings are ordered by robot, and robots without nearby objects read 0
+        sensor_left, sensor_right = self._sensor_readings([x[robots], y[robots], w[robots]],
+                                                          [self.object_x[objects], self.object_y[objects]])
 
-        # Run through objects and take the largest stimulus as sensor reading
-        for obj in self.objects:
-            sl, sr = self._sensor_reading_from_object([x, y, w], [obj['x'], obj['y']])
-            sensor_left, sensor_right = max(sensor_left, sl), max(sensor_right, sr)
+        counts = np.bincount(robots, minlength=len(x))
+        readers = np.where(counts > 0)[0]
+        first_readings = (np.cumsum(counts) - counts)[readers]
 
-        return sensor_left, sensor_right
+        left, right = np.zeros(len(x)), np.zeros(len(x))
 
-    def _new_object(self):
-        return {'x': rn.rand() * self.x_max,
-                'y': rn.rand() * self.y_max,
-                'r': self.min_size + rn.rand() * (self.max_size - self.min_size)}
+        # Take the largest stimulus across objects as sensor reading
+        if len(readers) > 0:
+            left[readers] = np.maximum.reduceat(sensor_left, first_readings)
+            right[readers] = np.maximum.reduceat(sensor_right, first_readings)
 
-    def _sensor_reading_from_object(self, (x, y, w), (ox, oy)):
+        if shape == ():
+            return left[0], right[0]
+
+        return left.reshape(shape), right.reshape(shape)
+
+    def _cell_of(self, x, y):
+        cell_x = np.floor(x * self.cells_x / self.x_max).astype(int) % self.cells_x
+        cell_y = np.floor(y * self.cells_y / self.y_max).astype(int) % self.cells_y
+
+        return cell_y * self.cells_x + cell_x
+
+    def _nearby_objects(self, x, y):
         """
-        Determines the individual sensor readings from the given co-ords to the object
+        Pairs every robot with each of the objects in its cell and the cells around it, returning
+        arrays of the robot and object indexes of every pair, ordered by robot. Objects in a cell that
+        neighbours the robot's cell more than one way round the torus are paired with it more than once.
         """
 
-        sensor_range = 25.0
-        dx, dy, z = self._distance_from([x, y], [ox, oy])
+        cell_x = np.floor(x * self.cells_x / self.x_max).astype(int)
+        cell_y = np.floor(y * self.cells_y / self.y_max).astype(int)
+
+        offsets = np.arange(-1, 2)
+
+        # [robots, 9] cells around every robot
+        around_x = (cell_x[:, np.newaxis, np.newaxis] + offsets[np.newaxis, np.newaxis, :]) % self.cells_x
+        around_y = (cell_y[:, np.newaxis, np.newaxis] + offsets[np.newaxis, :, np.newaxis]) % self.cells_y
+        cells = (around_y * self.cells_x + around_x).reshape(len(x), -1)
+
+        starts = self._grid_offsets[cells].ravel()
+        lengths = self._grid_offsets[cells + 1].ravel() - starts
 
-        if z < sensor_range:
-            v = np.arctan2(dy, dx)
-            v = v + 2 * np.pi if v < 0 else v
+        robots = np.repeat(np.arange(len(x)), lengths.reshape(len(x), -1).sum(axis=1))
+        positions = np.arange(np.sum(lengths)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
 
-            dw = v - w  # difference in robot's heading and object
-            stimulus = (sensor_range - z) / sensor_range
+        return robots, self._grid_objects[np.repeat(starts, lengths) + positions]
 
-            if _within_left_sensor(dw):
-                return stimulus, 0
+    def _sensor_readings(self, (x, y, w), (ox, oy)):
+        """
+        Determines the individual sensor readings from the given co-ords to each object
+        """
+
+        sensor_range = self.sensor_range
+        dx, dy, z = self._distance_from([x, y], [ox, oy])
 
-            elif _within_right_sensor(dw):
-                return 0, stimulus
+        v = np.arctan2(dy, dx)
+        v = np.where(v < 0, v + 2 * np.pi, v)
 
-        return 0, 0
+        dw = v - w  # difference in robot's heading and object
+        stimulus = np.where(z < sensor_range, (sensor_range - z) / sensor_range, 0)
+
+        left = _within_left_sensor(dw)
+        right = ~left & _within_right_sensor(dw)
+
+        return np.where(left, stimulus, 0), np.where(right, stimulus, 0)
 
     def _distance_from(self, (x1, y1), (x2, y2)):
         """
         The computed distance is the closest across the torus. This means we will travel across the
-        boundary if that is a closer match.
+        boundary, either way, if that is a closer match.
         """
 
-        x2 = x2 + self.x_max if abs(x2 + self.x_max - x1) < abs(x2 - x1) else x2
-        y2 = y2 + self.y_max if abs(y2 + self.y_max - y1) < abs(y2 - y1) else y2
+        x2 = self._closest_across_torus(x1, x2, self.x_max)
+        y2 = self._closest_across_torus(y1, y2, self.y_max)
 
         dx = x2 - x1
         dy = y2 - y1
@@ -84,3 +161,10 @@ class Environment:
         z = np.sqrt(dx ** 2 + dy ** 2)
 
         return dx, dy, z
+
+    @staticmethod
+    def _closest_across_torus(x1, x2, size):
+        above = np.abs(x2 + size - x1) < np.abs(x2 - x1)
+        below = ~above & (np.abs(x2 - size - x1) < np.abs(x2 - x1))
+
+        return np.where(above, x2 + size, np.where(below, x2 - size, x2))
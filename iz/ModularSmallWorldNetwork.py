@@ -9,16 +9,15 @@ import numpy as np
 from Plotters import plot_connectivity_matrix
 
 
-def select_random_int(low, high, not_allowed=None):
+def select_random_ints(low, high, not_allowed):
     """
-    Generates an integer between low and high, that is not equal to not_allowed
+    Generates an integer between low and high for every entry of not_allowed, that is not equal to
+    that entry
     """
 
-    r = np.random.randint(low, high)
-    while r == not_allowed:
-        r = np.random.randint(low, high)
+    r = np.random.randint(low, high - 1, len(not_allowed))
 
-    return r
+    return r + (r >= not_allowed)
 
 
 class ModularSmallWorldNetwork(object):
@@ -54,13 +53,24 @@ class ModularSmallWorldNetwork(object):
         lower = module_index * nodes_in_module
         upper = lower + nodes_in_module
 
-        count = 0
+        # Every one-way edge in the module without a self connection is numbered by a key, of which
+        # the keys of existing edges are not available
+        no_of_keys = nodes_in_module * (nodes_in_module - 1)
+        taken = self._edge_keys(*np.nonzero(self.CIJ[lower:upper, lower:upper]))
 
-        while count < no_of_edges:
-            i, j = np.random.randint(lower, upper, (2))
-            if (i != j) and self.CIJ[i][j] == 0:
-                count = count + 1
-                self.CIJ[i][j] = 1
+        if no_of_edges > no_of_keys - len(taken):
+            raise StandardError("Module " + str(module_index) + " has room for only " +
+                                str(no_of_keys - len(taken)) + " more edges")
+
+        keys = np.empty(0, dtype=int)
+
+        # Draw all the edges at once, and top up with another draw for any lost as duplicates
+        while len(keys) < no_of_edges:
+            drawn = np.random.randint(0, no_of_keys, 2 * (no_of_edges - len(keys)))
+            keys = np.union1d(keys, np.setdiff1d(drawn, taken))
+
+        i, j = self._edge_nodes(np.random.permutation(keys)[:no_of_edges])
+        self.CIJ[lower + i, lower + j] = 1
 
     def rewire_network(self, p):
         """
@@ -69,16 +79,34 @@ class ModularSmallWorldNetwork(object):
 
         nodes_in_module = self.n / self.C
 
-        for i, j in self.connected_neurons():
-            if np.random.random_sample() < p:
-                target_module = select_random_int(0, self.C, not_allowed=i % nodes_in_module)
-                target_node = target_module * nodes_in_module + np.random.randint(nodes_in_module)
+        i, j = np.where(self.CIJ == 1)
+        rewired = np.random.random_sample(len(i)) < p
+        i, j = i[rewired], j[rewired]
+
+        target_modules = select_random_ints(0, self.C, not_allowed=i / nodes_in_module)
+        target_nodes = target_modules * nodes_in_module + np.random.randint(nodes_in_module, size=len(i))
 
-                self.CIJ[i][j] = 0
-                self.CIJ[i][target_node] = 1
+        self.CIJ[i, j] = 0
+        self.CIJ[i, target_nodes] = 1
 
         return self
 
+    def _edge_keys(self, i, j):
+        """
+        Numbers the one-way edges from node i to node j of a module, skipping self connections
+        """
+
+        return i * (self.n / self.C - 1) + j - (j > i)
+
+    def _edge_nodes(self, keys):
+        """
+        Returns the nodes (i, j) of a module at either end of the numbered edges, see _edge_keys
+        """
+
+        i, j = np.divmod(keys, self.n / self.C - 1)
+
+        return i, j + (j >= i)
+
     def connected_neurons(self):
         """
         Returns iterable tuples of (i, j), where there is a connection from neuron i to neuron j in